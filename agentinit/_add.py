@@ -3,12 +3,19 @@
 from __future__ import annotations
 
 import os
-import shutil
+import re
 import sys
 from typing import Callable
 
 ADD_RESOURCE_TYPES = ("mcp", "security", "skill", "soul")
 
+# Descriptions live in the frontmatter or first heading, so a short prefix suffices.
+_DESCRIPTION_SCAN_BYTES = 4096
+_DESCRIPTION_RE = re.compile(
+    r"^[ \t]*(?:description:(.*)|# [ \t]*(\S.*))$",
+    re.MULTILINE,
+)
+
 _ADD_HANDLERS = {
     "skill": {
         "template_src": os.path.join("skills", "{name}"),
@@ -66,16 +73,15 @@ def _extract_template_description(src_path: str) -> str:
     if not os.path.isfile(src_path):
         return ""
     try:
-        with open(src_path, "r", encoding="utf-8") as f:
-            for raw in f:
-                line = raw.strip()
-                if line.startswith("description:"):
-                    return line.split(":", 1)[1].strip()
-                if line.startswith("# "):
-                    return line[2:].strip()
+        with open(src_path, "rb") as f:
+            head = f.read(_DESCRIPTION_SCAN_BYTES).decode("utf-8", "replace")
     except OSError:
         return ""
-    return ""
+    match = _DESCRIPTION_RE.search(head)
+    if not match:
+        return ""
+    desc = match.group(1) if match.group(1) is not None else match.group(2)
+    return desc.strip()
 
 
 def _list_available(resource_type: str, add_template_dir: str) -> list[str]:
@@ -87,13 +93,14 @@ def _list_available(resource_type: str, add_template_dir: str) -> list[str]:
         parent = os.path.join(add_template_dir, os.path.dirname(src_pattern))
         if not os.path.isdir(parent):
             return []
-        entries = sorted(os.listdir(parent))
+        with os.scandir(parent) as it:
+            entries = sorted(it, key=lambda e: e.name)
         if handler["is_dir"]:
-            return [e for e in entries if os.path.isdir(os.path.join(parent, e))]
+            return [e.name for e in entries if e.is_dir()]
         return [
-            os.path.splitext(e)[0]
+            os.path.splitext(e.name)[0]
             for e in entries
-            if os.path.isfile(os.path.join(parent, e)) and e.endswith(".md")
+            if e.name.endswith(".md") and e.is_file()
         ]
 
     src = os.path.join(add_template_dir, src_pattern)
@@ -286,6 +293,8 @@ def _prepare_destination(dest: str, dst: str, force: bool) -> bool:
     if os.path.exists(dst) and force:
         try:
             if os.path.isdir(dst):
+                import shutil
+
                 shutil.rmtree(dst)
             else:
                 os.remove(dst)
@@ -296,21 +305,28 @@ def _prepare_destination(dest: str, dst: str, force: bool) -> bool:
 
 def _copy_resource(src: str, dst: str, is_dir: bool) -> None:
     """Copy file or directory resource into destination."""
+    import shutil
+
+    # Copy content and mode only; template timestamps/xattrs mean nothing here.
     if is_dir:
-        shutil.copytree(src, dst)
+        shutil.copytree(src, dst, copy_function=shutil.copy)
     else:
-        shutil.copy2(src, dst)
+        shutil.copy(src, dst)
 
 
-def _apply_post_copy(resource_type: str, dst: str, name: str | None) -> None:
-    """Apply resource-specific post-copy transforms."""
-    if resource_type != "soul":
-        return
-    with open(dst, "r", encoding="utf-8") as f:
-        content = f.read()
-    content = content.replace("{{NAME}}", str(name))
-    with open(dst, "w", encoding="utf-8", newline="\n") as f:
-        f.write(content)
+def _write_named_resource(src: str, dst: str, name: str | None) -> None:
+    """Write *src* to *dst* with the {{NAME}} placeholder filled in one pass.
+
+    Output is LF-only and keeps the template's mode, like the copy path.
+    """
+    import shutil
+
+    with open(src, "rb") as f:
+        data = f.read()
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    with open(dst, "wb") as f:
+        f.write(data.replace(b"{{NAME}}", str(name).encode("utf-8")))
+    shutil.copymode(src, dst)
 
 
 def cmd_add(
@@ -351,8 +367,10 @@ def cmd_add(
     if not _prepare_destination(dest, dst, bool(args.force)):
         return
 
-    _copy_resource(src, dst, bool(handler["is_dir"]))
-    _apply_post_copy(resource_type, dst, name)
+    if resource_type == "soul":
+        _write_named_resource(src, dst, name)
+    else:
+        _copy_resource(src, dst, bool(handler["is_dir"]))
 
     rel_dst = os.path.relpath(dst, dest)
     print(f"Added {resource_type}: {rel_dst}")
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import fnmatch
-import json
 import os
 import re
 from dataclasses import dataclass, field
@@ -94,6 +93,8 @@ def _load_config_data(path: Path | None) -> dict[str, object] | None:
     """Read and parse config JSON as a dict."""
     if path is None:
         return None
+    import json
+
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
     except (OSError, ValueError):
@@ -209,8 +210,45 @@ def _rel(path: Path, root: Path) -> str:
     return str(path.relative_to(root))
 
 
+# "<literal dir>/**/<name pattern>" — the shape of every built-in glob.
+_RECURSIVE_GLOB_RE = re.compile(r"^([^*?\[\]]+)/\*\*/([^/]+)$")
+
+
+def _scan_tree(top: Path, name_pattern: str) -> list[Path]:
+    """Return files under *top* matching *name_pattern*, pruning *_EXCLUDE_DIRS*.
+
+    Equivalent to ``top.glob("**/" + name_pattern)`` plus an ``is_file``
+    filter, but uses the entry types from ``os.scandir`` so plain files and
+    directories cost no extra ``stat`` call and excluded trees are never
+    entered.
+    """
+    results: list[Path] = []
+    stack = [str(top)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _EXCLUDE_DIRS:
+                        stack.append(entry.path)
+                elif fnmatch.fnmatch(entry.name, name_pattern) and entry.is_file():
+                    results.append(Path(entry.path))
+    return results
+
+
 def _iter_glob(root: Path, pattern: str) -> list[Path]:
     """Glob *pattern* under *root*, skipping *_EXCLUDE_DIRS* directories."""
+    match = _RECURSIVE_GLOB_RE.match(pattern)
+    if match:
+        parts = match.group(1).split("/")
+        if not any(part in ("", ".", "..") for part in parts):
+            if any(part in _EXCLUDE_DIRS for part in parts):
+                return []
+            return sorted(_scan_tree(root.joinpath(*parts), match.group(2)))
+
     results: list[Path] = []
     for p in sorted(root.glob(pattern)):
         if not p.is_file():
@@ -339,6 +377,12 @@ def discover_context_files(root: Path, config: Config | None = None) -> list[Pat
 # ---------------------------------------------------------------------------
 
 
+def _count_lines(data: bytes) -> int:
+    """Count lines as ``len(data.splitlines())`` does, without building the list."""
+    breaks = data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+    return breaks if not data or data.endswith((b"\n", b"\r")) else breaks + 1
+
+
 def _check_line_budget(
     root: Path,
     files: list[Path],
@@ -349,10 +393,9 @@ def _check_line_budget(
     for fpath in files:
         rel = _rel(fpath, root)
         try:
-            lines = fpath.read_text(encoding="utf-8", errors="replace").splitlines()
+            count = _count_lines(fpath.read_bytes())
         except OSError:
             continue
-        count = len(lines)
         result.file_sizes[rel] = count
 
         hot = rel in hot_rels
@@ -402,25 +445,29 @@ _STANDALONE_PATH_RE = re.compile(
     r"[\s]*$"
 )
 _SKIP_RE = re.compile(r"^(https?://|mailto:|#)")
+_FILE_EXT_RE = re.compile(r"\.\w{1,6}$")
 
 
 def _looks_like_path(s: str) -> bool:
     """Heuristic: has a slash or ends with a known file extension."""
     if "/" in s:
         return True
-    return bool(re.search(r"\.\w{1,6}$", s))
+    return bool(_FILE_EXT_RE.search(s))
 
 
 def _extract_refs_from_line(line: str) -> list[str]:
     """Extract markdown links, @imports, and standalone path candidates."""
     refs: list[str] = []
 
-    refs.extend(m.group(1) for m in _MD_LINK_RE.finditer(line))
+    # Most lines hold neither delimiter; skip those regex scans outright.
+    if "](" in line:
+        refs.extend(m.group(1) for m in _MD_LINK_RE.finditer(line))
 
-    for m in _AT_IMPORT_RE.finditer(line):
-        token = m.group(1)
-        if _looks_like_path(token):
-            refs.append(token)
+    if "@" in line:
+        for m in _AT_IMPORT_RE.finditer(line):
+            token = m.group(1)
+            if _looks_like_path(token):
+                refs.append(token)
 
     sm = _STANDALONE_PATH_RE.match(line)
     if sm:
@@ -465,7 +512,8 @@ def _check_refs_in_file(
     except OSError:
         return
 
-    root_resolved = root.resolve()
+    root_real = os.path.normcase(str(root.resolve()))
+    root_prefix = root_real.rstrip(os.sep) + os.sep
     seen: set[str] = set()
 
     for lineno, line in enumerate(raw, 1):
@@ -476,9 +524,8 @@ def _check_refs_in_file(
             seen.add(ref)
 
             target = _resolve_ref_target(root, fpath, ref)
-            try:
-                target.relative_to(root_resolved)
-            except ValueError:
+            target_real = os.path.normcase(str(target))
+            if target_real != root_real and not target_real.startswith(root_prefix):
                 result.diagnostics.append(
                     Diagnostic(
                         rel_name,
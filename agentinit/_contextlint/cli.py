@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import argparse
-import json as _json
 from pathlib import Path
 
 from agentinit._contextlint import __version__
@@ -69,6 +68,8 @@ def _print_text(result: LintResult) -> None:
 
 
 def _print_json(result: LintResult) -> None:
+    import json
+
     hards = [d for d in result.diagnostics if d.hard]
     softs = [d for d in result.diagnostics if not d.hard]
     output = {
@@ -88,7 +89,7 @@ def _print_json(result: LintResult) -> None:
             "warnings": len(softs),
         },
     }
-    print(_json.dumps(output, indent=2))
+    print(json.dumps(output, indent=2))
 
 
 # ---------------------------------------------------------------------------
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import os
 from argparse import Namespace
-from pathlib import Path
 from typing import Callable
 
 from agentinit._profiles import looks_like_minimal_profile
@@ -131,6 +130,8 @@ def _check_contextlint(
 ) -> list[tuple[str, str]]:
     """Run contextlint and return issues with fix hints."""
     try:
+        from pathlib import Path
+
         from agentinit.contextlint_adapter import get_checks_module
 
         checks_mod = get_checks_module()
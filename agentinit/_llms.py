@@ -4,6 +4,7 @@ import os
 import re
 
 from agentinit._project_detect import (
+    _PURPOSE_LINE_RES,
     _PURPOSE_PLACEHOLDER,
     _extract_purpose_original_marker,
     _extract_purpose_text,
@@ -25,6 +26,8 @@ _GENERATED_LLMS_HEADINGS = (
     "## Hardened Mandates",
     "## Skills & Routers",
 )
+_QUOTE_PREFIX_RE = re.compile(r"^>\s*")
+_BULLET_PREFIX_RE = re.compile(r"^[-*]\s*")
 
 
 def _resolve_project_context_path(dest):
@@ -184,8 +187,8 @@ def _extract_project_summary(dest, project_path):
         detected = _detect_project_summary(dest)
         return detected or _LLMS_DEFAULT_SUMMARY
 
-    for pattern in (r"^\*\*Purpose:\*\*\s*(.+)$", r"^Purpose:\s*(.+)$"):
-        match = re.search(pattern, content, re.MULTILINE)
+    for pattern in _PURPOSE_LINE_RES:
+        match = pattern.search(content)
         if not match:
             continue
         summary = match.group(1).strip()
@@ -245,8 +248,8 @@ def _extract_hardened_mandates(agents_path):
                 index = 0
                 for raw_line in f:
                     clean = raw_line.strip()
-                    clean = re.sub(r"^>\s*", "", clean)
-                    clean = re.sub(r"^[-*]\s*", "", clean)
+                    clean = _QUOTE_PREFIX_RE.sub("", clean)
+                    clean = _BULLET_PREFIX_RE.sub("", clean)
                     if not clean:
                         continue
                     if "MUST ALWAYS" not in clean and "MUST NEVER" not in clean:
@@ -1,7 +1,29 @@
 """Argument parser builder for agentinit CLI."""
 
 import argparse
-import importlib.metadata
+
+
+class _LazyVersionAction(argparse.Action):
+    """Resolve the installed package version only when --version is used."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, help=None):
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=argparse.SUPPRESS,
+            nargs=0,
+            help=help,
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        import importlib.metadata
+
+        try:
+            version = importlib.metadata.version("agentinit")
+        except importlib.metadata.PackageNotFoundError:
+            version = "dev"
+        print(version)
+        parser.exit()
 
 
 def _add_scaffold_args(parser, skeleton_choices):
@@ -46,14 +68,10 @@ def build_parser(skeleton_choices, add_resource_types):
         prog="agentinit",
         description="Scaffold agent context files into a project.",
     )
-    try:
-        _version = importlib.metadata.version("agentinit")
-    except importlib.metadata.PackageNotFoundError:
-        _version = "dev"
     parser.add_argument(
         "--version",
-        action="version",
-        version=_version,
+        action=_LazyVersionAction,
+        help="show program's version number and exit",
     )
     sub = parser.add_subparsers(dest="command")
 
@@ -11,6 +11,16 @@ _PURPOSE_ORIGINAL_MARKER_RE = re.compile(
     r"^<!--\s*agentinit:purpose-original:\s*(.*?)\s*-->\s*$",
     re.MULTILINE,
 )
+# Bold form first: it wins over a bare "Purpose:" line when both exist.
+_PURPOSE_LINE_RES = (
+    re.compile(r"^\*\*Purpose:\*\*\s*(.+)$", re.MULTILINE),
+    re.compile(r"^Purpose:\s*(.+)$", re.MULTILINE),
+)
+_PURPOSE_VALUE_RES = (
+    re.compile(r"(\*\*Purpose:\*\*\s*)(.+)", re.MULTILINE),
+    re.compile(r"(Purpose:\s*)(.+)", re.MULTILINE),
+)
+_PURPOSE_BOLD_LINE_RE = re.compile(r"^(\*\*Purpose:\*\*.+)$", re.MULTILINE)
 
 _LANGUAGE_MARKERS = {
     "it": {
@@ -95,8 +105,8 @@ def _ascii_fold(text):
 
 def _extract_purpose_text(content):
     """Extract Purpose text from docs/PROJECT.md content."""
-    for pattern in (r"^\*\*Purpose:\*\*\s*(.+)$", r"^Purpose:\s*(.+)$"):
-        match = re.search(pattern, content, re.MULTILINE)
+    for pattern in _PURPOSE_LINE_RES:
+        match = pattern.search(content)
         if match:
             return match.group(1).strip()
     return ""
@@ -117,9 +127,8 @@ def _set_purpose_original_marker(content, original_purpose):
     if _PURPOSE_ORIGINAL_MARKER_RE.search(content):
         return _PURPOSE_ORIGINAL_MARKER_RE.sub(marker, content, count=1)
 
-    pattern = re.compile(r"^(\*\*Purpose:\*\*.+)$", re.MULTILINE)
-    if pattern.search(content):
-        return pattern.sub(rf"\1\n{marker}", content, count=1)
+    if _PURPOSE_BOLD_LINE_RE.search(content):
+        return _PURPOSE_BOLD_LINE_RE.sub(rf"\1\n{marker}", content, count=1)
     return content
 
 
@@ -130,13 +139,9 @@ def _clear_purpose_original_marker(content):
 
 def _replace_purpose_text(content, new_purpose):
     """Replace Purpose value in PROJECT.md content."""
-    for pattern in (r"(\*\*Purpose:\*\*\s*)(.+)", r"(Purpose:\s*)(.+)"):
-        updated, count = re.subn(
-            pattern,
-            lambda m: f"{m.group(1)}{new_purpose}",
-            content,
-            count=1,
-            flags=re.MULTILINE,
+    for pattern in _PURPOSE_VALUE_RES:
+        updated, count = pattern.subn(
+            lambda m: f"{m.group(1)}{new_purpose}", content, count=1
         )
         if count:
             return updated
@@ -381,19 +386,17 @@ def _run_detect(dest, project_path, content):
         except (OSError, ValueError, IndexError):
             pass
 
-    # TOML parsers (Python, Rust)
-    try:
-        import tomllib
-    except ImportError:
-        tomllib = None
-
-    if not tomllib:
-        toml_files = [
-            f
-            for f in ("pyproject.toml", "Cargo.toml")
-            if os.path.isfile(os.path.join(dest, f))
-        ]
-        if toml_files:
+    # TOML parsers (Python, Rust); only import tomllib when a manifest exists.
+    toml_files = [
+        f
+        for f in ("pyproject.toml", "Cargo.toml")
+        if os.path.isfile(os.path.join(dest, f))
+    ]
+    tomllib = None
+    if toml_files:
+        try:
+            import tomllib
+        except ImportError:
             print(
                 "Warning:" + f" TOML detection ({', '.join(toml_files)}) skipped — "
                 "requires Python 3.11+. Run with Python 3.11 or later for full detection.",
@@ -403,7 +406,7 @@ def _run_detect(dest, project_path, content):
     if tomllib:
         # 3. Rust: Cargo.toml
         cargo_path = os.path.join(dest, "Cargo.toml")
-        if os.path.isfile(cargo_path):
+        if "Cargo.toml" in toml_files:
             try:
                 with open(cargo_path, "rb") as f:
                     cargo_data = tomllib.load(f)
@@ -430,7 +433,7 @@ def _run_detect(dest, project_path, content):
 
         # 4. Python: pyproject.toml
         pyproject_path = os.path.join(dest, "pyproject.toml")
-        if os.path.isfile(pyproject_path):
+        if "pyproject.toml" in toml_files:
             try:
                 with open(pyproject_path, "rb") as f:
                     py_data = tomllib.load(f)
@@ -14,7 +14,6 @@ from agentinit._project_detect import (
     _clear_purpose_original_marker,
     _detect_purpose_language,
     _extract_purpose_text,
-    _purpose_seems_non_english,
     _replace_commands_section,
     _replace_purpose_text,
     _run_detect,
@@ -112,6 +111,8 @@ def apply_updates(
         commands = ""
 
     translate_requested = bool(getattr(args, "translate_purpose", False))
+    # Language detection folds and tokenizes the text; do it once per purpose.
+    purpose_lang = _detect_purpose_language(purpose)
 
     project_changed = False
     project_content = ""
@@ -132,7 +133,7 @@ def apply_updates(
             if purpose:
                 content = content.replace(_PURPOSE_PLACEHOLDER, purpose)
                 content = _replace_purpose_text(content, purpose)
-                if _detect_purpose_language(purpose) == "en":
+                if purpose_lang == "en":
                     content = _clear_purpose_original_marker(content)
 
             if wizard_run:
@@ -153,7 +154,11 @@ def apply_updates(
                     content = content.replace(old_constraints, f"- {constraints}")
 
             current_purpose = _extract_purpose_text(content)
-            current_lang = _detect_purpose_language(current_purpose)
+            current_lang = (
+                purpose_lang
+                if current_purpose == purpose
+                else _detect_purpose_language(current_purpose)
+            )
             should_translate = bool(
                 current_purpose
                 and current_purpose != _PURPOSE_PLACEHOLDER
@@ -166,7 +171,7 @@ def apply_updates(
                     content = _replace_purpose_text(content, translated)
                     content = _set_purpose_original_marker(content, current_purpose)
                     print("Purpose translated to English for docs/*")
-            elif purpose and _purpose_seems_non_english(purpose):
+            elif purpose and purpose_lang in {"it", "es", "fr"}:
                 print(
                     warning_prefix()
                     + " --purpose appears non-English; keep docs/* in English when possible.",
@@ -177,8 +182,9 @@ def apply_updates(
                 content = _run_detect(dest, project_path, content)
 
             project_changed = content != original_content
-            with open(project_path, "w", encoding="utf-8", newline="\n") as f:
-                f.write(content)
+            if project_changed:
+                with open(project_path, "w", encoding="utf-8", newline="\n") as f:
+                    f.write(content)
         project_content = content
 
         if can_write(project_rel) and not wizard_run and "(not configured)" in content:
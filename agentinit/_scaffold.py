@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
+import errno
 import os
-import shutil
+import stat
 import sys
 import time
 from argparse import Namespace
 from collections.abc import Callable, Mapping, Sequence, Set
 from dataclasses import dataclass
-from datetime import date, datetime
 from typing import TextIO
 
 from agentinit._llms import _render_llms_content as _render_llms_content_impl
@@ -19,6 +19,104 @@ Colorize = Callable[[str, str, TextIO | None], str]
 PrintNextSteps = Callable[[str], None]
 ResolvesWithin = Callable[[str, str], bool]
 
+# copy_file_range errors meaning "not supported here", not a failed copy.
+_COPY_FALLBACK_ERRNOS = frozenset(
+    {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL}
+)
+
+# Clock seam for archive timestamps; tests patch this, not the time module.
+_now_ns = time.time_ns
+
+# os.rmdir failures that just mean "nothing to clean up here".
+_NOT_AN_EMPTY_DIR_ERRNOS = frozenset(
+    {errno.ENOENT, errno.ENOTDIR, errno.ENOTEMPTY, errno.EEXIST}
+)
+
+_TODO_STUB = b"""\
+# TODO
+
+## In Progress
+- Fill `docs/PROJECT.md` with real stack and command details.
+
+## Next
+- Fill `docs/CONVENTIONS.md` with concrete team standards.
+- Review generated agent router files and customize as needed.
+
+## Blocked
+- (none)
+
+## Done
+- Scaffolded project with agentinit.
+"""
+
+
+def _lstat_or_none(path: str) -> os.stat_result | None:
+    """Return ``os.lstat(path)``, or None when nothing exists at *path*."""
+    try:
+        return os.lstat(path)
+    except OSError:
+        return None
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write *data* to *path* with raw os calls, skipping the text I/O stack."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _move_file(src: str, dst: str) -> None:
+    """Rename *src* to *dst*, copying across filesystems only when forced to."""
+    try:
+        os.replace(src, dst)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        import shutil
+
+        shutil.move(src, dst)
+
+
+def _fastcopy(src: str, dst: str) -> None:
+    """Copy *src* to *dst* like shutil.copy2, preferring in-kernel copies.
+
+    On Linux ``os.copy_file_range`` lets the kernel copy (or reflink, on
+    btrfs/XFS) without moving data through userspace. Elsewhere shutil.copy2
+    already picks the platform fast path (CopyFile2 on Windows, fcopyfile
+    on macOS).
+    """
+    import shutil
+
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        shutil.copy2(src, dst)
+        return
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(src_fd).st_size
+        copied = 0
+        try:
+            while copied < size:
+                n = copy_file_range(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError as exc:
+            # Fall back only for an unsupported filesystem pair, and only
+            # before anything was written; real I/O errors propagate.
+            if copied or exc.errno not in _COPY_FALLBACK_ERRNOS:
+                raise
+        if not copied:
+            fsrc.seek(0)
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
 
 @dataclass(frozen=True)
 class ConsolePalette:
@@ -85,14 +183,16 @@ class ScaffoldOps:
             "Created project", self._palette.green + self._palette.bold
         )
 
-    def _template_source_for(self, rel: str, minimal: bool) -> str:
+    def _template_source_for(self, rel: str, minimal: bool) -> str | None:
+        """Return the template file to copy for *rel*, or None if none ships."""
         if minimal and rel in self.config.minimal_template_overrides:
             override = os.path.join(
                 self.config.template_dir, self.config.minimal_template_overrides[rel]
             )
             if os.path.exists(override):
                 return override
-        return os.path.join(self.config.template_dir, rel)
+        src = os.path.join(self.config.template_dir, rel)
+        return src if os.path.exists(src) else None
 
     def _should_skip_skeleton_dir(self, dirname: str) -> bool:
         return dirname in self.config.skeleton_ignored_dir_names or dirname.endswith(
@@ -136,13 +236,14 @@ class ScaffoldOps:
     def _skip_existing_destination(
         self, rel: str, dst: str, force: bool, skipped: list[str]
     ) -> bool:
-        if not os.path.lexists(dst):
+        st = _lstat_or_none(dst)
+        if st is None:
             return False
-        if os.path.islink(dst):
+        if stat.S_ISLNK(st.st_mode):
             self._warn_skip(rel, "Warning: destination is a symlink, skipping: {rel}")
             skipped.append(rel)
             return True
-        if os.path.isdir(dst):
+        if stat.S_ISDIR(st.st_mode):
             self._warn_skip(rel, "Warning: destination is a directory, skipping: {rel}")
             skipped.append(rel)
             return True
@@ -161,11 +262,20 @@ class ScaffoldOps:
         return False
 
     def _copy_template_file(
-        self, src: str, dst: str, rel: str, force: bool, skipped: list[str]
+        self,
+        src: str,
+        dst: str,
+        rel: str,
+        force: bool,
+        skipped: list[str],
+        made_dirs: set[str],
     ) -> bool:
-        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        parent = os.path.dirname(dst)
+        if parent not in made_dirs:
+            os.makedirs(parent, exist_ok=True)
+            made_dirs.add(parent)
         try:
-            shutil.copy2(src, dst)
+            _fastcopy(src, dst)
         except PermissionError:
             if not force or not os.path.exists(dst):
                 print(
@@ -175,7 +285,7 @@ class ScaffoldOps:
                 skipped.append(rel)
                 return False
             os.chmod(dst, 0o644)
-            shutil.copy2(src, dst)
+            _fastcopy(src, dst)
         return True
 
     def copy_template(
@@ -184,15 +294,17 @@ class ScaffoldOps:
         """Copy template files into dest."""
         copied: list[str] = []
         skipped: list[str] = []
+        # Most templates share a parent; create each directory only once.
+        made_dirs: set[str] = set()
         dest_real = os.path.realpath(dest)
         files_to_copy = (
             self.config.minimal_managed_files if minimal else self.config.managed_files
         )
         for rel in files_to_copy:
             src = self._template_source_for(rel, minimal)
-            dst = os.path.join(dest, rel)
-            if not os.path.exists(src):
+            if src is None:
                 continue
+            dst = os.path.join(dest, rel)
             if not self._resolves_within(dest_real, os.path.dirname(dst)):
                 self._warn_skip(
                     rel,
@@ -200,16 +312,11 @@ class ScaffoldOps:
                 )
                 skipped.append(rel)
                 continue
+            # With the parent inside the project, dst can only escape through
+            # a symlink at its final component, which this check refuses.
             if self._skip_existing_destination(rel, dst, force, skipped):
                 continue
-            if not self._resolves_within(dest_real, dst):
-                self._warn_skip(
-                    rel,
-                    "Warning: destination resolves outside project, skipping: {rel}",
-                )
-                skipped.append(rel)
-                continue
-            if self._copy_template_file(src, dst, rel, force, skipped):
+            if self._copy_template_file(src, dst, rel, force, skipped, made_dirs):
                 copied.append(rel)
         return copied, skipped
 
@@ -227,6 +334,9 @@ class ScaffoldOps:
             )
             sys.exit(1)
 
+        import shutil
+
+        made_dirs: set[str] = set()
         dest_real = os.path.realpath(dest)
         for root, dirnames, files in os.walk(skeleton_root):
             dirnames[:] = sorted(
@@ -254,7 +364,10 @@ class ScaffoldOps:
                 if not self._resolves_within(dest_real, dst):
                     skipped.append(rel)
                     continue
-                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                parent = os.path.dirname(dst)
+                if parent not in made_dirs:
+                    os.makedirs(parent, exist_ok=True)
+                    made_dirs.add(parent)
                 shutil.copy2(src, dst)
                 copied.append(rel)
         return copied, skipped
@@ -301,24 +414,7 @@ class ScaffoldOps:
             )
             return
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        content = """\
-# TODO
-
-## In Progress
-- Fill `docs/PROJECT.md` with real stack and command details.
-
-## Next
-- Fill `docs/CONVENTIONS.md` with concrete team standards.
-- Review generated agent router files and customize as needed.
-
-## Blocked
-- (none)
-
-## Done
-- Scaffolded project with agentinit.
-"""
-        with open(path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(content)
+        _write_bytes(path, _TODO_STUB)
 
     def write_decisions(self, dest: str, force: bool = False) -> None:
         """Write DECISIONS.md with the first ADR-lite entry."""
@@ -333,7 +429,7 @@ class ScaffoldOps:
             )
             return
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        today = date.today().isoformat()
+        today = time.strftime("%Y-%m-%d")
         content = f"""\
 # Decisions
 
@@ -352,8 +448,7 @@ Use one ADR-lite entry per durable decision.
 - Rationale: Provides a single source of truth (AGENTS.md + docs/*) that all coding agents can share.
 - Alternatives: Per-agent full instructions; rejected due to drift risk and maintenance overhead.
 """
-        with open(path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(content)
+        _write_bytes(path, content.encode("utf-8"))
 
     def _ensure_template_dir(self) -> None:
         if os.path.isdir(self.config.template_dir):
@@ -518,14 +613,14 @@ Use one ADR-lite entry per durable decision.
         unsafe: list[str] = []
         for rel in self.config.removable_files:
             path = os.path.join(dest, rel)
-            if os.path.lexists(path):
-                if not self.validate_managed_path(dest, path):
-                    unsafe.append(rel)
-                    continue
-                is_dir = os.path.isdir(path) and not os.path.islink(path)
-                found.append((rel, is_dir))
-            else:
+            st = _lstat_or_none(path)
+            if st is None:
                 missing.append(rel)
+                continue
+            if not self.validate_managed_path(dest, path):
+                unsafe.append(rel)
+                continue
+            found.append((rel, stat.S_ISDIR(st.st_mode)))
 
         if not found:
             print("No agentinit-managed files found. Nothing to do.")
@@ -581,9 +676,26 @@ Use one ADR-lite entry per durable decision.
                 return
 
         if archive:
-            ts = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
-            archive_dir = os.path.join(dest, ".agentinit-archive", ts)
+            # Microsecond suffix keeps back-to-back archives apart; on a coarse
+            # clock a clash is still possible, so claim the directory with an
+            # exclusive mkdir and add a counter until one is free.
+            secs, nanos = divmod(_now_ns(), 1_000_000_000)
+            base_ts = time.strftime("%Y%m%d-%H%M%S", time.localtime(secs))
+            base_ts += f"-{nanos // 1000:06d}"
+            archive_root = os.path.join(dest, ".agentinit-archive")
+            os.makedirs(archive_root, exist_ok=True)
+            ts = base_ts
+            attempt = 0
+            while True:
+                archive_dir = os.path.join(archive_root, ts)
+                try:
+                    os.mkdir(archive_dir)
+                    break
+                except FileExistsError:
+                    attempt += 1
+                    ts = f"{base_ts}-{attempt}"
             archived = 0
+            made_dirs: set[str] = {archive_dir}
             for rel, is_dir in found:
                 if is_dir:
                     print(
@@ -594,9 +706,12 @@ Use one ADR-lite entry per durable decision.
                     continue
                 src = os.path.join(dest, rel)
                 dst = os.path.join(archive_dir, rel)
-                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                parent = os.path.dirname(dst)
+                if parent not in made_dirs:
+                    os.makedirs(parent, exist_ok=True)
+                    made_dirs.add(parent)
                 try:
-                    shutil.move(src, dst)
+                    _move_file(src, dst)
                     archived += 1
                 except OSError as exc:
                     print(
@@ -604,7 +719,17 @@ Use one ADR-lite entry per durable decision.
                         file=sys.stderr,
                     )
                     continue
-            print(f"Archived {archived} file(s) to .agentinit-archive/{ts}/")
+            if not archived:
+                # Nothing moved: drop the empty tree claimed above, bottom-up.
+                claimed = [d for d, _, _ in os.walk(archive_dir, topdown=False)]
+                for path in claimed + [archive_root]:
+                    try:
+                        os.rmdir(path)
+                    except OSError:
+                        pass
+                print("Archived 0 file(s).")
+            else:
+                print(f"Archived {archived} file(s) to .agentinit-archive/{ts}/")
         else:
             removed = 0
             for rel, is_dir in found:
@@ -630,6 +755,15 @@ Use one ADR-lite entry per durable decision.
             dirpath = os.path.join(dest, rel)
             if os.path.islink(dirpath):
                 continue
-            if os.path.isdir(dirpath) and not os.listdir(dirpath):
+            # rmdir only succeeds on an empty directory; let it do the checking.
+            try:
                 os.rmdir(dirpath)
-                print(f"  Cleaned up empty directory: {rel}/")
+            except OSError as exc:
+                if exc.errno not in _NOT_AN_EMPTY_DIR_ERRNOS:
+                    print(
+                        self._warning_prefix()
+                        + f" failed to clean up directory {rel}/: {exc}",
+                        file=sys.stderr,
+                    )
+                continue
+            print(f"  Cleaned up empty directory: {rel}/")
@@ -4,13 +4,16 @@ from __future__ import annotations
 
 import os
 import re
+import stat
 import sys
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import Callable
 
 from agentinit._profiles import looks_like_minimal_profile
 
+_MD_LINK_RE = re.compile(r"\[.*?\]\(([^)]+)\)")
+_CODE_SPAN_RE = re.compile(r"`([^`\n]+)`")
+
 
 @dataclass
 class StatusState:
@@ -29,15 +32,23 @@ def _print_status_header(dest: str) -> None:
 
 
 def _is_missing_path(path: str) -> tuple[bool, str]:
-    if os.path.islink(path) and not os.path.exists(path):
-        return True, "broken symlink"
-    if not os.path.exists(path):
-        return True, "missing"
-    if not os.path.isfile(path):
+    # One stat classifies the common case; only failures pay for the lstat.
+    # Opening first would save this call but can block on FIFOs.
+    try:
+        st = os.stat(path)
+    except OSError:
+        return True, "broken symlink" if os.path.islink(path) else "missing"
+    if not stat.S_ISREG(st.st_mode):
         return True, "not a file"
     return False, ""
 
 
+def _count_lines(content: str) -> int:
+    """Count lines as ``len(content.splitlines())`` does for LF-only text."""
+    newlines = content.count("\n")
+    return newlines if not content or content.endswith("\n") else newlines + 1
+
+
 def _is_always_loaded(rel: str) -> bool:
     return not rel.startswith("docs/") and rel not in {
         ".gitignore",
@@ -95,9 +106,12 @@ def _print_file_status(
 
 
 def _collect_agent_ref_candidates(content: str, lines: list[str]) -> set[str]:
-    md_links = re.findall(r"\[.*?\]\(([^)]+)\)", content)
-    code_links = re.findall(r"`([^`\n]+)`", content)
-    potential_paths = set(md_links + code_links)
+    potential_paths: set[str] = set()
+    # Skip the regex scans outright when their delimiters never occur.
+    if "](" in content:
+        potential_paths.update(_MD_LINK_RE.findall(content))
+    if "`" in content:
+        potential_paths.update(_CODE_SPAN_RE.findall(content))
 
     for line in lines:
         line = line.strip()
@@ -144,13 +158,17 @@ def _check_agents_refs(
     minimal_mode: bool,
     minimal_ref_paths: set[str],
 ) -> None:
+    seen_refs: set[str] = set()
     seen_broken: set[str] = set()
+    # Resolve the root once; resolves_within only resolves the target.
     dest_real = os.path.realpath(dest)
 
     for raw in _collect_agent_ref_candidates(content, lines):
         ref = _normalize_ref(raw)
-        if not _is_valid_ref_candidate(ref):
+        # Links that differ only by anchor or query resolve to the same path.
+        if ref in seen_refs or not _is_valid_ref_candidate(ref):
             continue
+        seen_refs.add(ref)
         norm_ref = os.path.normpath(ref).replace("\\", "/")
         if minimal_mode and norm_ref not in minimal_ref_paths:
             continue
@@ -159,14 +177,13 @@ def _check_agents_refs(
         if not resolves_within(dest_real, target_path):
             continue
 
-        target_real = os.path.realpath(target_path)
-        if os.path.exists(target_real) or norm_ref in seen_broken:
+        if os.path.exists(target_path) or norm_ref in seen_broken:
             continue
 
         seen_broken.add(norm_ref)
         state.broken_refs.append(norm_ref)
-        print(f"      x Broken reference: {norm_ref}")
         print(
+            f"      x Broken reference: {norm_ref}\n"
             f"      Hint: Fix broken link: create {norm_ref} or remove the reference."
         )
 
@@ -187,15 +204,18 @@ def _check_single_file(
         return
 
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
+        # Binary read: one sized read, one decode, no text-layer buffering.
+        with open(path, "rb") as f:
+            content = f.read().decode("utf-8")
     except (OSError, UnicodeDecodeError):
         state.missing.append(rel)
         print(f"  x {rel} (unreadable)")
         return
+    if "\r" in content:
+        # Match text-mode universal newlines, so CR-only files count lines too.
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
 
-    lines = content.splitlines()
-    line_count = len(lines)
+    line_count = _count_lines(content)
     state.file_sizes.append((rel, line_count))
     symbol, msgs, hints = _build_file_messages(rel, content, line_count, state)
     _print_file_status(rel, symbol, msgs, hints)
@@ -204,7 +224,7 @@ def _check_single_file(
         _check_agents_refs(
             dest,
             content,
-            lines,
+            content.splitlines(),
             state,
             resolves_within,
             minimal_mode,
@@ -235,6 +255,8 @@ def _run_contextlint(
     dest: str, state: StatusState, *, selected_paths: set[str] | None = None
 ) -> None:
     try:
+        from pathlib import Path
+
         from agentinit.contextlint_adapter import get_checks_module
 
         checks_mod = get_checks_module()
@@ -249,19 +271,20 @@ def _run_contextlint(
         hard_diags = [d for d in lint_result.diagnostics if d.hard]
         soft_diags = [d for d in lint_result.diagnostics if not d.hard]
         if lint_result.diagnostics:
-            print("\nContext checks (contextlint):")
+            # Build the report up front and emit it in one write.
+            out = ["\nContext checks (contextlint):"]
             for diag in lint_result.diagnostics:
                 prefix = "ERROR" if diag.hard else "warn"
                 loc = f"{diag.path}:{diag.lineno}" if diag.lineno else diag.path
-                print(f"  {prefix}  {loc}: {diag.message}")
+                out.append(f"  {prefix}  {loc}: {diag.message}")
             offenders = checks_mod.top_offenders(lint_result)
             if offenders:
-                print("\n  Top offenders by size:")
-                for path, size in offenders:
-                    print(f"    {path}: {size} lines")
-            print(
+                out.append("\n  Top offenders by size:")
+                out.extend(f"    {path}: {size} lines" for path, size in offenders)
+            out.append(
                 f"\n  contextlint: {len(hard_diags)} error(s), {len(soft_diags)} warning(s)"
             )
+            sys.stdout.write("\n".join(out) + "\n")
             if hard_diags:
                 state.contextlint_hard = True
     except Exception as exc:  # pragma: no cover - defensive failure mode
@@ -288,15 +311,14 @@ def _issue_list(state: StatusState) -> list[str]:
 
 
 def _print_top_offenders(state: StatusState) -> None:
-    print("Top offenders:")
+    out = ["Top offenders:"]
     if state.file_sizes:
         filtered = [(f, n) for f, n in state.file_sizes if f != ".gitignore"]
         filtered.sort(key=lambda x: x[1], reverse=True)
-        for f_rel, f_lines in filtered[:3]:
-            print(f"  {f_rel} ({f_lines} lines)")
+        out.extend(f"  {f_rel} ({f_lines} lines)" for f_rel, f_lines in filtered[:3])
     if state.broken_refs:
-        print(f"  AGENTS.md: {len(state.broken_refs)} broken references")
-    print()
+        out.append(f"  AGENTS.md: {len(state.broken_refs)} broken references")
+    sys.stdout.write("\n".join(out) + "\n\n")
 
 
 def _has_issues(state: StatusState) -> bool:
@@ -176,14 +176,17 @@ CLEANUP_DIRS = [
 ]
 
 
-def _resolves_within(root: str, path: str) -> bool:
-    """Return True when path resolves inside root after following symlinks."""
-    try:
-        root_real = os.path.realpath(root)
-        path_real = os.path.realpath(path)
-        return os.path.commonpath([root_real, path_real]) == root_real
-    except ValueError:
-        return False
+def _resolves_within(root_real: str, path: str) -> bool:
+    """Return True when path resolves inside root_real after following symlinks.
+
+    *root_real* must already be resolved; every caller passes the
+    ``os.path.realpath`` of its project or template root.
+    """
+    root_real = os.path.normcase(root_real)
+    path_real = os.path.normcase(os.path.realpath(path))
+    if path_real == root_real:
+        return True
+    return path_real.startswith(root_real.rstrip(os.sep) + os.sep)
 
 
 def _scaffold_ops() -> ScaffoldOps:
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
-"""Backward-compatible shim — delegates to the agentinit package."""
+"""Backward-compatible shim — delegates to the agentinit package.
+
+Prefer the installed ``agentinit`` console script or ``python -m agentinit``.
+"""
 
 import os
 import sys
 
-# Allow running from the repo without installing the package.
+# Run directly, sys.path[0] is cli/ and "agentinit" would resolve to this
+# file; put the repo root first so the package always wins.
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
 from agentinit.cli import main
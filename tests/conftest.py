@@ -0,0 +1,111 @@
+"""Shared pytest fixtures."""
+
+import shutil
+import sys
+
+import pytest
+
+import agentinit.cli as cli
+from tests.helpers import make_init_args
+
+
+@pytest.fixture(scope="session")
+def template_snapshot(tmp_path_factory):
+    """A project scaffolded once per session by copy_template; treat as read-only."""
+    root = tmp_path_factory.mktemp("template-snapshot")
+    cli.copy_template(str(root))
+    return root
+
+
+@pytest.fixture
+def seeded_tmp_path(tmp_path, template_snapshot):
+    """tmp_path pre-populated with a private copy of the template snapshot."""
+    shutil.copytree(
+        template_snapshot, tmp_path, dirs_exist_ok=True, copy_function=shutil.copy
+    )
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def init_snapshot(tmp_path_factory):
+    """A project created once per session by cmd_init; treat as read-only."""
+    root = tmp_path_factory.mktemp("init-snapshot")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(root)
+        cli.cmd_init(make_init_args())
+    return root
+
+
+@pytest.fixture
+def init_project(tmp_path, monkeypatch, init_snapshot):
+    """Chdir into tmp_path holding a private copy of the cmd_init snapshot."""
+    # Real copies, not hardlinks: tests rewrite managed files in place.
+    shutil.copytree(
+        init_snapshot, tmp_path, dirs_exist_ok=True, copy_function=shutil.copy
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def missing_template_dir(tmp_path, monkeypatch):
+    """Point cli.TEMPLATE_DIR at a directory that does not exist."""
+    monkeypatch.setattr(cli, "TEMPLATE_DIR", str(tmp_path / "nonexistent"))
+
+
+@pytest.fixture
+def empty_template_dir(tmp_path, monkeypatch):
+    """Point cli.TEMPLATE_DIR at an existing but empty directory."""
+    empty = tmp_path / "empty_template"
+    empty.mkdir()
+    monkeypatch.setattr(cli, "TEMPLATE_DIR", str(empty))
+
+
+@pytest.fixture(scope="session")
+def parser():
+    """The CLI argument parser; parse_args does not mutate it, so share one."""
+    return cli.build_parser()
+
+
+def _true():
+    return True
+
+
+def _false():
+    return False
+
+
+@pytest.fixture
+def tty_stdin(monkeypatch):
+    """Make sys.stdin report an interactive terminal."""
+    monkeypatch.setattr(sys.stdin, "isatty", _true)
+
+
+@pytest.fixture
+def non_tty_stdin(monkeypatch):
+    """Make sys.stdin report a non-interactive stream."""
+    monkeypatch.setattr(sys.stdin, "isatty", _false)
+
+
+@pytest.fixture
+def fake_input(monkeypatch):
+    """Return an installer that feeds canned answers to builtins.input in order.
+
+    An answer that is an exception class or instance is raised instead, e.g.
+    ``fake_input(EOFError)`` to simulate Ctrl+D.
+    """
+
+    def install(*answers):
+        next_answer = iter(answers).__next__
+
+        def fake(_prompt=""):
+            answer = next_answer()
+            if isinstance(answer, BaseException) or (
+                isinstance(answer, type) and issubclass(answer, BaseException)
+            ):
+                raise answer
+            return answer
+
+        monkeypatch.setattr("builtins.input", fake)
+
+    return install
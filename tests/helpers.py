@@ -1,83 +1,137 @@
-"""Shared test helpers for CLI argparse namespace construction."""
+"""Shared test helpers: CLI argparse namespaces, file seeding and assertions."""
 
 import argparse
+import contextlib
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+_NEW_ARGS_DEFAULTS = {
+    "name": "proj",
+    "dir": None,
+    "force": False,
+    "yes": True,
+    "purpose": None,
+    "prompt": False,
+    "minimal": False,
+    "translate_purpose": False,
+    "skeleton": None,
+}
+
+_INIT_ARGS_DEFAULTS = {
+    "force": False,
+    "yes": False,
+    "minimal": False,
+    "purpose": None,
+    "prompt": False,
+    "detect": False,
+    "translate_purpose": False,
+    "skeleton": None,
+}
+
+_REMOVE_ARGS_DEFAULTS = {"force": True, "dry_run": False, "archive": False}
+
+_STATUS_ARGS_DEFAULTS = {"check": False, "minimal": False}
+
+_LINT_ARGS_DEFAULTS = {"config": None, "format": "text", "no_dup": False, "root": None}
+
+_ADD_ARGS_DEFAULTS = {
+    "type": "skill",
+    "name": "code-reviewer",
+    "list": False,
+    "force": False,
+}
+
+_DOCTOR_ARGS_DEFAULTS = {"minimal": False}
+
+_SYNC_ARGS_DEFAULTS = {"check": False, "diff": False, "root": None, "minimal": False}
 
 
 def make_args(**kwargs):
     """Build an argparse.Namespace with sensible defaults for cmd_new."""
-    defaults = {
-        "name": "proj",
-        "dir": None,
-        "force": False,
-        "yes": True,
-        "purpose": None,
-        "prompt": False,
-        "minimal": False,
-        "translate_purpose": False,
-        "skeleton": None,
-    }
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_NEW_ARGS_DEFAULTS, **kwargs})
 
 
 def make_init_args(**kwargs):
-    defaults = {
-        "force": False,
-        "yes": False,
-        "minimal": False,
-        "purpose": None,
-        "prompt": False,
-        "detect": False,
-        "translate_purpose": False,
-        "skeleton": None,
-    }
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_INIT_ARGS_DEFAULTS, **kwargs})
 
 
 def make_remove_args(**kwargs):
-    defaults = {"force": True, "dry_run": False, "archive": False}
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_REMOVE_ARGS_DEFAULTS, **kwargs})
 
 
 def make_status_args(**kwargs):
-    defaults = {"check": False, "minimal": False}
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_STATUS_ARGS_DEFAULTS, **kwargs})
 
 
 def make_lint_args(**kwargs):
-    defaults = {"config": None, "format": "text", "no_dup": False, "root": None}
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_LINT_ARGS_DEFAULTS, **kwargs})
 
 
 def make_add_args(**kwargs):
-    defaults = {"type": "skill", "name": "code-reviewer", "list": False, "force": False}
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_ADD_ARGS_DEFAULTS, **kwargs})
 
 
 def make_doctor_args(**kwargs):
-    defaults = {"minimal": False}
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_DOCTOR_ARGS_DEFAULTS, **kwargs})
 
 
 def make_sync_args(**kwargs):
-    defaults = {"check": False, "diff": False, "root": None, "minimal": False}
-    defaults.update(kwargs)
-    return argparse.Namespace(**defaults)
+    return argparse.Namespace(**{**_SYNC_ARGS_DEFAULTS, **kwargs})
+
+
+def write_file(root, rel, text):
+    """Write *text* as UTF-8 to *root*/*rel*, creating parent dirs; return the Path."""
+    path = Path(root, rel)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(text.encode("utf-8"))
+    return path
 
 
 def fill_tbd(root, files):
     """Replace all TBD markers in the given managed files."""
-    from pathlib import Path
-
-    root = Path(root)
     for rel in files:
-        path = root / rel
-        if path.is_file():
-            content = path.read_text(encoding="utf-8")
-            path.write_text(content.replace("TBD", "done"), encoding="utf-8")
+        path = os.path.join(root, rel)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            with open(path, "wb") as f:
+                f.write(data.replace(b"TBD", b"done"))
+
+
+def list_files(root):
+    """Return sorted relative POSIX paths of all regular files under *root*."""
+    files = []
+    stack = [(str(root), "")]
+    while stack:
+        path, prefix = stack.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                rel = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, rel + "/"))
+                elif entry.is_file():
+                    files.append(rel)
+    return sorted(files)
+
+
+@contextlib.contextmanager
+def file_mode(path, mode):
+    """Temporarily chmod *path* to *mode*; restore it unless the file is gone."""
+    original = stat.S_IMODE(os.stat(path).st_mode)
+    os.chmod(path, mode)
+    try:
+        yield path
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.chmod(path, original)
+
+
+@contextlib.contextmanager
+def expect_exit(code):
+    """Assert that the block raises SystemExit with exit status *code*."""
+    with pytest.raises(SystemExit) as exc:
+        yield
+    assert exc.value.code == code
@@ -1,38 +1,42 @@
 """Tests for lint, add, and contextlint integration."""
 
 import json
+import stat
 import sys
 
 import pytest
 
 import agentinit.cli as cli
+from agentinit import _add
+from agentinit._contextlint.checks import (
+    discover_context_files,
+    load_config,
+    run_checks,
+)
 from tests.helpers import (
+    expect_exit,
     fill_tbd,
     make_add_args,
     make_init_args,
     make_lint_args,
     make_status_args,
+    write_file,
 )
 
 
 class TestCmdLint:
-    def test_lint_clean_project_exits_0(self, tmp_path, monkeypatch):
+    def test_lint_clean_project_exits_0(self, tmp_path, init_project):
         """agentinit init → agentinit lint returns 0 on a clean project."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         # Rewrite AGENTS.md without broken refs
         (tmp_path / "AGENTS.md").write_text(
             "# Agents\n\nSee [project](docs/PROJECT.md).\n", encoding="utf-8"
         )
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_lint(make_lint_args())
-        assert exc.value.code == 0
 
-    def test_status_check_exits_1_on_broken_ref(self, tmp_path, monkeypatch, capsys):
+    def test_status_check_exits_1_on_broken_ref(self, tmp_path, init_project, capsys):
         """Inject broken ref in .claude/rules/, verify status --check exits 1."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         # Clean AGENTS.md of broken refs
         (tmp_path / "AGENTS.md").write_text(
@@ -44,16 +48,13 @@ class TestCmdLint:
             "# Style\n\nSee [missing](docs/NOPE.md) for details.\n",
             encoding="utf-8",
         )
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
         assert "contextlint" in out.lower() or "ERROR" in out
 
-    def test_lint_format_json_valid(self, tmp_path, monkeypatch, capsys):
+    def test_lint_format_json_valid(self, tmp_path, init_project, capsys):
         """agentinit lint --format json produces valid JSON with expected keys."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         (tmp_path / "AGENTS.md").write_text(
             "# Agents\n\nSee [project](docs/PROJECT.md).\n", encoding="utf-8"
@@ -79,16 +80,13 @@ class TestCmdLint:
             encoding="utf-8",
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_lint(make_lint_args())
-        assert exc.value.code == 0
 
     def test_lint_invalid_list_config_types_do_not_ignore_everything(
         self, tmp_path, monkeypatch
     ):
         """String-valued list settings should be ignored, not expanded character-by-character."""
-        from agentinit._contextlint.checks import discover_context_files, load_config
-
         monkeypatch.chdir(tmp_path)
         (tmp_path / "AGENTS.md").write_text("# Agents\n", encoding="utf-8")
         (tmp_path / "CLAUDE.md").write_text("See AGENTS.md\n", encoding="utf-8")
@@ -109,6 +107,22 @@ class TestCmdLint:
             "docs/GUIDE.md",
         ]
 
+    def test_discovery_walks_nested_docs_and_skips_excluded_dirs(self, tmp_path):
+        (tmp_path / "docs" / "guides" / "deep").mkdir(parents=True)
+        (tmp_path / "docs" / "node_modules").mkdir()
+        (tmp_path / "docs" / "guides" / "deep" / "A.md").write_text("a\n")
+        (tmp_path / "docs" / "guides" / "notes.txt").write_text("n\n")
+        (tmp_path / "docs" / "node_modules" / "B.md").write_text("b\n")
+        (tmp_path / ".claude" / "rules").mkdir(parents=True)
+        (tmp_path / ".claude" / "rules" / "style.md").write_text("s\n")
+
+        discovered = discover_context_files(tmp_path)
+
+        assert [p.relative_to(tmp_path).as_posix() for p in discovered] == [
+            ".claude/rules/style.md",
+            "docs/guides/deep/A.md",
+        ]
+
     def test_lint_resolves_relative_links_from_current_file(
         self, tmp_path, monkeypatch
     ):
@@ -122,16 +136,32 @@ class TestCmdLint:
             "See [README](../README.md)\n", encoding="utf-8"
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_lint(make_lint_args())
-        assert exc.value.code == 0
+
+    def test_lint_flags_ref_into_sibling_with_shared_prefix(self, tmp_path):
+        """A ref into ../<root>-other/ escapes the root even though names share a prefix."""
+        root = tmp_path / "proj"
+        root.mkdir()
+        (tmp_path / "proj-other").mkdir()
+        (tmp_path / "proj-other" / "NOTES.md").write_text("x\n", encoding="utf-8")
+        (root / "AGENTS.md").write_text(
+            "See [notes](../proj-other/NOTES.md)\n", encoding="utf-8"
+        )
+
+        messages = [d.message for d in run_checks(root=root).diagnostics]
+        assert "ref '../proj-other/NOTES.md' escapes repo root — ignored" in messages
+
+    @pytest.mark.parametrize("eol", [b"\n", b"\r\n", b"\r"], ids=["lf", "crlf", "cr"])
+    def test_line_budget_counts_any_line_ending(self, tmp_path, eol):
+        (tmp_path / "AGENTS.md").write_bytes(b"line" + (eol + b"line") * 300)
+        result = run_checks(root=tmp_path, check_dup=False)
+        assert result.file_sizes["AGENTS.md"] == 301
 
 
 class TestRouterSanityFiltering:
     def test_router_sanity_respects_selected_paths(self, tmp_path, monkeypatch):
         """Router sanity should only check files within selected_paths."""
-        from agentinit._contextlint.checks import run_checks
-
         monkeypatch.chdir(tmp_path)
         # Create AGENTS.md, CLAUDE.md (valid), and GEMINI.md (invalid — no pointer)
         (tmp_path / "AGENTS.md").write_text("# Agents\n", encoding="utf-8")
@@ -175,9 +205,8 @@ class TestRouterSanityFiltering:
                 content = path.read_text(encoding="utf-8")
                 path.write_text(content.replace("TBD", "done"), encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(minimal=True, check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "GEMINI.md" not in out
 
@@ -276,17 +305,15 @@ class TestCmdAdd:
         (tmp_path / ".claude" / "keep.txt").write_text("keep", encoding="utf-8")
 
         args = make_add_args(type="skill", name="..", force=True)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_add(args)
-        assert exc.value.code == 1
         assert (tmp_path / ".claude" / "keep.txt").exists()
 
     def test_add_mcp_rejects_path_traversal_name(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
         args = make_add_args(type="mcp", name="../mcp/github")
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_add(args)
-        assert exc.value.code == 1
         assert not (tmp_path / ".agents").exists()
 
     def test_add_skill_force_overwrites_existing_file(self, tmp_path, monkeypatch):
@@ -302,11 +329,8 @@ class TestCmdAdd:
         assert target.is_dir()
         assert (target / "SKILL.md").is_file()
 
-    def test_add_mcp_force_overwrites_existing_directory(self, tmp_path, monkeypatch):
+    def test_add_mcp_force_overwrites_existing_directory(self, tmp_path, init_project):
         """--force should replace a colliding directory path with the MCP file."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
         target = tmp_path / ".agents" / "mcp-github.md"
         target.mkdir(parents=True)
         (target / "placeholder.txt").write_text("old", encoding="utf-8")
@@ -318,12 +342,9 @@ class TestCmdAdd:
         assert not (tmp_path / ".agents" / "mcp-github.md" / "github.md").exists()
 
     def test_add_security_force_overwrites_existing_directory(
-        self, tmp_path, monkeypatch
+        self, tmp_path, init_project
     ):
         """--force should replace a colliding directory path with the security file."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
         target = tmp_path / ".agents" / "security.md"
         target.mkdir(parents=True)
         (target / "placeholder.txt").write_text("old", encoding="utf-8")
@@ -334,20 +355,13 @@ class TestCmdAdd:
         assert target.is_file()
         assert not (tmp_path / ".agents" / "security.md" / "security.md").exists()
 
-    def test_add_soul_requires_name(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_add_soul_requires_name(self, init_project, capsys):
         args = make_add_args(type="soul", name=None)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_add(args)
-        assert exc.value.code == 1
         assert "requires a persona name" in capsys.readouterr().err
 
-    def test_add_soul_replaces_name_placeholder(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_add_soul_replaces_name_placeholder(self, tmp_path, init_project):
         args = make_add_args(type="soul", name="CodePilot")
         cli.cmd_add(args)
 
@@ -355,13 +369,32 @@ class TestCmdAdd:
         assert "{{NAME}}" not in content
         assert "CodePilot" in content
 
+    def test_add_list_shows_template_descriptions(self, capsys):
+        cli.cmd_add(make_add_args(type="skill", name=None, list=True))
+        cli.cmd_add(make_add_args(type="security", name=None, list=True))
+        out = capsys.readouterr().out
+        assert "code-reviewer" in out
+        assert 'wants to "review code"' in out
+        assert "Security Guardrails" in out
+
+    def test_named_resource_normalizes_newlines_and_keeps_mode(self, tmp_path):
+        src = write_file(tmp_path, "soul.md", "# {{NAME}}\r\nline\rend\r\n")
+        src.chmod(0o640)
+        dst = tmp_path / "out.md"
+        _add._write_named_resource(str(src), str(dst), "Pilot")
+        assert dst.read_bytes() == b"# Pilot\nline\nend\n"
+        assert stat.S_IMODE(dst.stat().st_mode) == 0o640
+
+    def test_template_description_skips_empty_heading(self, tmp_path):
+        src = write_file(tmp_path, "tpl.md", "# \n\n# Real Title\n")
+        assert _add._extract_template_description(str(src)) == "Real Title"
+
 
 class TestPrintNextSteps:
     def test_print_next_steps_with_tty_all_files(self, monkeypatch, capsys, tmp_path):
 
         monkeypatch.chdir(tmp_path)
         monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
-        from agentinit import cli
 
         # Create all dummy files/dirs
         (tmp_path / "AGENTS.md").touch()
@@ -381,7 +414,6 @@ class TestPrintNextSteps:
 
         monkeypatch.chdir(tmp_path)
         monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
-        from agentinit import cli
 
         # Create only some dummy files/dirs
         (tmp_path / "AGENTS.md").touch()
@@ -400,7 +432,6 @@ class TestPrintNextSteps:
 
         monkeypatch.chdir(tmp_path)
         monkeypatch.setattr(sys.stdout, "isatty", lambda: False)
-        from agentinit import cli
 
         (tmp_path / "AGENTS.md").touch()
 
@@ -413,7 +444,6 @@ class TestPrintNextSteps:
 
         monkeypatch.chdir(tmp_path)
         monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
-        from agentinit import cli
 
         # Create no files
         cli._print_next_steps(str(tmp_path))
@@ -1,36 +1,44 @@
 """Tests for project commands (new, init, remove, sync, doctor, main)."""
 
+import importlib.metadata
+import os
+import re
+import runpy
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 import agentinit.cli as cli
+from agentinit import _scaffold
 from tests.helpers import (
+    expect_exit,
+    file_mode,
+    list_files,
     make_args,
     make_doctor_args,
     make_init_args,
     make_remove_args,
     make_sync_args,
+    write_file,
 )
 
+_SEMVER_RE = re.compile(r"\d+\.\d+\.\d+")
+
 
 class TestCmdNew:
     def test_creates_project(self, tmp_path):
         args = make_args(name="myproj", dir=str(tmp_path))
         cli.cmd_new(args)
-        proj = tmp_path / "myproj"
-        assert proj.is_dir()
-        assert (proj / "AGENTS.md").exists()
-        assert (proj / "docs" / "TODO.md").exists()
-        assert (proj / "docs" / "DECISIONS.md").exists()
+        files = set(list_files(tmp_path / "myproj"))
+        assert {"AGENTS.md", "docs/TODO.md", "docs/DECISIONS.md"} <= files
 
     def test_fails_if_exists_no_force(self, tmp_path):
         (tmp_path / "myproj").mkdir()
         args = make_args(name="myproj", dir=str(tmp_path), yes=False)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_new(args)
-        assert exc.value.code == 1
 
     def test_force_overwrites(self, tmp_path):
         args = make_args(name="myproj", dir=str(tmp_path))
@@ -44,18 +52,16 @@ class TestCmdNew:
         target = tmp_path / "myproj"
         target.write_text("not a directory", encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_new(make_args(name="myproj", dir=str(tmp_path), force=True))
 
-        assert exc.value.code == 1
         assert "is not a directory" in capsys.readouterr().err
 
     @pytest.mark.parametrize("bad_name", ["..", ".", "../.."])
     def test_rejects_traversal_names(self, tmp_path, bad_name, capsys):
         args = make_args(name=bad_name, dir=str(tmp_path))
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_new(args)
-        assert exc.value.code == 1
         assert "invalid project name" in capsys.readouterr().err
 
     def test_accepts_path_with_slashes(self, tmp_path):
@@ -63,22 +69,18 @@ class TestCmdNew:
         cli.cmd_new(args)
         assert (tmp_path / "sub" / "proj" / "AGENTS.md").exists()
 
-    def test_missing_template_no_orphan_dir(self, tmp_path, monkeypatch):
-        monkeypatch.setattr(cli, "TEMPLATE_DIR", str(tmp_path / "nonexistent"))
+    @pytest.mark.usefixtures("missing_template_dir")
+    def test_missing_template_no_orphan_dir(self, tmp_path):
         args = make_args(name="newproj", dir=str(tmp_path))
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_new(args)
-        assert exc.value.code == 1
         assert not (tmp_path / "newproj").exists()
 
-    def test_empty_template_no_orphan_dir(self, tmp_path, monkeypatch):
-        empty_template = tmp_path / "empty_template"
-        empty_template.mkdir()
-        monkeypatch.setattr(cli, "TEMPLATE_DIR", str(empty_template))
+    @pytest.mark.usefixtures("empty_template_dir")
+    def test_empty_template_no_orphan_dir(self, tmp_path):
         args = make_args(name="newproj", dir=str(tmp_path))
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_new(args)
-        assert exc.value.code == 1
         assert not (tmp_path / "newproj").exists()
 
     def test_preserves_todo_without_force(self, tmp_path):
@@ -96,7 +98,7 @@ class TestCmdNew:
         args = make_args(name="myproj", dir=str(tmp_path), minimal=True, yes=True)
         cli.cmd_new(args)
         proj = tmp_path / "myproj"
-        files = sorted(str(p.relative_to(proj)) for p in proj.rglob("*") if p.is_file())
+        files = list_files(proj)
         assert files == [
             "AGENTS.md",
             "CLAUDE.md",
@@ -160,36 +162,23 @@ class TestCmdNew:
         assert "# Decisions Template" not in decisions
         assert "already exists, skipping" not in err
 
-    def test_yes_overrides_prompt(self, tmp_path, monkeypatch):
+    @pytest.mark.usefixtures("non_tty_stdin")
+    def test_yes_overrides_prompt(self, tmp_path):
         """--yes disables --prompt so no interactive wizard runs."""
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: False)
-        monkeypatch.setattr(
-            sys,
-            "argv",
-            [
-                "agentinit",
-                "new",
-                "proj",
-                "--yes",
-                "--prompt",
-                "--dir",
-                str(tmp_path),
-            ],
-        )
-        cli.main()
+        args = make_args(name="proj", dir=str(tmp_path), yes=True, prompt=True)
+        cli.cmd_new(args)
         # Should succeed without prompting (--yes wins over --prompt)
+        assert args.prompt is False
         assert (tmp_path / "proj" / "AGENTS.md").exists()
 
 
 class TestCmdInit:
-    def test_copies_files_to_cwd(self, tmp_path, monkeypatch):
+    def test_copies_files_to_cwd_and_is_idempotent(self, tmp_path, monkeypatch, capsys):
         monkeypatch.chdir(tmp_path)
         cli.cmd_init(make_init_args())
         assert (tmp_path / "AGENTS.md").exists()
+        capsys.readouterr()
 
-    def test_idempotent(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         cli.cmd_init(make_init_args())
         out = capsys.readouterr().out
         assert "already present" in out
@@ -197,9 +186,7 @@ class TestCmdInit:
     def test_minimal_creates_only_core_files(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
         cli.cmd_init(make_init_args(minimal=True))
-        files = sorted(
-            str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*") if p.is_file()
-        )
+        files = list_files(tmp_path)
         assert files == [
             "AGENTS.md",
             "CLAUDE.md",
@@ -240,12 +227,8 @@ class TestCmdInit:
         self, tmp_path, monkeypatch
     ):
         monkeypatch.chdir(tmp_path)
-        docs = tmp_path / "docs"
-        docs.mkdir()
-        project = docs / "PROJECT.md"
-        conventions = docs / "CONVENTIONS.md"
-        project.write_text("custom project")
-        conventions.write_text("custom conventions")
+        project = write_file(tmp_path, "docs/PROJECT.md", "custom project")
+        conventions = write_file(tmp_path, "docs/CONVENTIONS.md", "custom conventions")
 
         cli.cmd_init(make_init_args(minimal=True, force=False))
 
@@ -295,22 +278,18 @@ class TestCmdInit:
         assert llms != stale_llms
         assert "> Fresh purpose" in llms
 
+    @pytest.mark.usefixtures("missing_template_dir")
     def test_missing_template_dir_prints_to_stderr(self, tmp_path, monkeypatch, capsys):
         monkeypatch.chdir(tmp_path)
-        monkeypatch.setattr(cli, "TEMPLATE_DIR", str(tmp_path / "nonexistent"))
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_init(make_init_args())
-        assert exc.value.code == 1
         assert "template directory not found" in capsys.readouterr().err
 
+    @pytest.mark.usefixtures("empty_template_dir")
     def test_empty_template_dir_prints_to_stderr(self, tmp_path, monkeypatch, capsys):
         monkeypatch.chdir(tmp_path)
-        fake = tmp_path / "empty_template"
-        fake.mkdir()
-        monkeypatch.setattr(cli, "TEMPLATE_DIR", str(fake))
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_init(make_init_args())
-        assert exc.value.code == 1
         assert "no template files copied" in capsys.readouterr().err
 
     def test_purpose_prefills_project(self, tmp_path, monkeypatch):
@@ -320,10 +299,7 @@ class TestCmdInit:
         assert "My cool project" in content
         assert "Describe what this project is for" not in content
 
-    def test_full_routers_use_direct_imports(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_full_routers_use_direct_imports(self, tmp_path, init_project):
         claude = (tmp_path / "CLAUDE.md").read_text(encoding="utf-8")
         gemini = (tmp_path / "GEMINI.md").read_text(encoding="utf-8")
 
@@ -335,26 +311,19 @@ class TestCmdInit:
             assert "@docs/DECISIONS.md" in text
             assert "@docs/STATE.md" in text
 
+    @pytest.mark.usefixtures("non_tty_stdin")
     def test_prompt_fails_without_tty(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: False)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_init(make_init_args(prompt=True))
-        assert exc.value.code == 1
 
-    def test_wizard_eof_aborts(self, tmp_path, monkeypatch, capsys):
+    @pytest.mark.usefixtures("tty_stdin")
+    def test_wizard_eof_aborts(self, seeded_tmp_path, monkeypatch, capsys, fake_input):
         """Ctrl+D during wizard prints 'Aborted.' and exits 130."""
-        monkeypatch.chdir(tmp_path)
-        cli.copy_template(str(tmp_path))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        import builtins
-
-        monkeypatch.setattr(
-            builtins, "input", lambda _prompt="": (_ for _ in ()).throw(EOFError)
-        )
-        with pytest.raises(SystemExit) as exc:
+        monkeypatch.chdir(seeded_tmp_path)
+        fake_input(EOFError)
+        with expect_exit(130):
             cli.cmd_init(make_init_args(prompt=True))
-        assert exc.value.code == 130
         assert "Aborted" in capsys.readouterr().out
 
     def test_yes_disables_prompt_in_direct_call(self, tmp_path, monkeypatch):
@@ -365,11 +334,10 @@ class TestCmdInit:
         assert not args.prompt
         assert (tmp_path / "AGENTS.md").exists()
 
-    def test_yes_acts_as_force(self, tmp_path, monkeypatch):
+    def test_yes_acts_as_force(self, tmp_path, monkeypatch, parser):
         """--yes implies --force and overwrites existing files."""
         monkeypatch.chdir(tmp_path)
         (tmp_path / "AGENTS.md").write_text("old content")
-        parser = cli.build_parser()
         args = parser.parse_args(["init", "--yes"])
 
         # Test the direct mapping in argparse
@@ -381,11 +349,10 @@ class TestCmdInit:
         assert args.force is True
         assert args.prompt is False
 
-    def test_y_alias_acts_as_force(self, tmp_path, monkeypatch):
+    def test_y_alias_acts_as_force(self, tmp_path, monkeypatch, parser):
         """-y implies --force via argparse and cmd_init."""
         monkeypatch.chdir(tmp_path)
         (tmp_path / "AGENTS.md").write_text("old content")
-        parser = cli.build_parser()
         args = parser.parse_args(["init", "-y"])
 
         # Test the alias mapping in argparse
@@ -403,9 +370,7 @@ class TestCmdMinimal:
         monkeypatch.chdir(tmp_path)
         monkeypatch.setattr(sys, "argv", ["agentinit", "minimal", "--yes"])
         cli.main()
-        files = sorted(
-            str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*") if p.is_file()
-        )
+        files = list_files(tmp_path)
         assert files == [
             "AGENTS.md",
             "CLAUDE.md",
@@ -416,10 +381,7 @@ class TestCmdMinimal:
 
     def test_with_purpose(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
-        monkeypatch.setattr(
-            sys, "argv", ["agentinit", "minimal", "--yes", "--purpose", "Quick test"]
-        )
-        cli.main()
+        cli.cmd_init(make_init_args(minimal=True, yes=True, purpose="Quick test"))
         content = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert "Quick test" in content
 
@@ -436,50 +398,64 @@ class TestCmdMinimal:
         monkeypatch.setattr(sys, "argv", ["agentinit", "minimal", "--yes"])
         cli.main()
 
-        files_a = sorted(
-            str(p.relative_to(dir_a)) for p in dir_a.rglob("*") if p.is_file()
-        )
-        files_b = sorted(
-            str(p.relative_to(dir_b)) for p in dir_b.rglob("*") if p.is_file()
-        )
-        assert files_a == files_b
+        assert list_files(dir_a) == list_files(dir_b)
 
 
 class TestCmdRemove:
-    def test_removes_files(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_removes_files(self, tmp_path, init_project):
         assert (tmp_path / "AGENTS.md").exists()
         cli.cmd_remove(make_remove_args())
         assert not (tmp_path / "AGENTS.md").exists()
 
-    def test_dry_run_keeps_files(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_dry_run_keeps_files(self, tmp_path, init_project, capsys):
         cli.cmd_remove(make_remove_args(dry_run=True))
         assert (tmp_path / "AGENTS.md").exists()
         assert "Dry run" in capsys.readouterr().out
 
-    def test_archive_moves_files(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_archive_leaves_nothing_when_no_file_moves(
+        self, tmp_path, init_project, monkeypatch, capsys
+    ):
+        def fail_move(src, dst):
+            raise OSError("simulated failure")
+
+        monkeypatch.setattr(_scaffold, "_move_file", fail_move)
+        cli.cmd_remove(make_remove_args(archive=True))
+        assert "Archived 0 file(s)." in capsys.readouterr().out
+        assert (tmp_path / "AGENTS.md").exists()
+        assert not (tmp_path / ".agentinit-archive").exists()
+
+    def test_archive_moves_files(self, tmp_path, init_project, monkeypatch):
+        # Freeze the clock so both runs produce the same timestamp.
+        monkeypatch.setattr(_scaffold, "_now_ns", lambda: 1_700_000_000_000_000_000)
         cli.cmd_remove(make_remove_args(archive=True))
         assert not (tmp_path / "AGENTS.md").exists()
         archives = list((tmp_path / ".agentinit-archive").iterdir())
         assert len(archives) == 1
         assert (archives[0] / "AGENTS.md").exists()
 
+        # Re-init and archive again: the second run must not merge into the
+        # first archive even though the timestamp is identical.
+        cli.cmd_init(make_init_args())
+        cli.cmd_remove(make_remove_args(archive=True))
+        archives = sorted((tmp_path / ".agentinit-archive").iterdir())
+        assert len(archives) == 2
+        assert archives[1].name == archives[0].name + "-1"
+        assert (archives[1] / "AGENTS.md").exists()
+
     def test_nothing_to_do(self, tmp_path, monkeypatch, capsys):
         monkeypatch.chdir(tmp_path)
         cli.cmd_remove(make_remove_args())
         assert "Nothing to do" in capsys.readouterr().out
 
-    def test_cleans_empty_dirs(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_cleans_empty_dirs(self, tmp_path, init_project):
         cli.cmd_remove(make_remove_args())
         assert not (tmp_path / "docs").exists()
 
+    def test_keeps_non_empty_dirs(self, tmp_path, init_project):
+        write_file(tmp_path, "docs/notes.md", "keep me\n")
+        cli.cmd_remove(make_remove_args())
+        assert list_files(tmp_path / "docs") == ["notes.md"]
+
     def test_skips_symlinked_managed_paths(self, tmp_path, monkeypatch, capsys):
         monkeypatch.chdir(tmp_path)
         outside = tmp_path.parent / f"{tmp_path.name}-external"
@@ -496,13 +472,10 @@ class TestCmdRemove:
         err = capsys.readouterr().err
         assert "managed path parent resolves outside project" in err
 
-    def test_confirm_fails_on_non_tty(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: False)
-        with pytest.raises(SystemExit) as exc:
+    @pytest.mark.usefixtures("non_tty_stdin")
+    def test_confirm_fails_on_non_tty(self, init_project, capsys):
+        with expect_exit(1):
             cli.cmd_remove(make_remove_args(force=False))
-        assert exc.value.code == 1
         assert "requires a terminal" in capsys.readouterr().err
 
 
@@ -527,19 +500,15 @@ class TestCmdSync:
         monkeypatch.chdir(tmp_path)
         cli.cmd_init(make_init_args(minimal=True))
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_sync(make_sync_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "Profile: minimal (auto-detected)" in out
         assert "GEMINI.md" not in out
 
     def test_sync_full_project_note_with_minimal_phrase_stays_full(
-        self, tmp_path, monkeypatch, capsys
+        self, tmp_path, init_project, capsys
     ):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
         agents = tmp_path / "AGENTS.md"
         agents.write_text(
             agents.read_text(encoding="utf-8")
@@ -548,17 +517,13 @@ class TestCmdSync:
         )
         (tmp_path / "GEMINI.md").unlink()
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_sync(make_sync_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
         assert "Profile: minimal" not in out
         assert "GEMINI.md (missing)" in out
 
-    def test_sync_updates_drifted_router_files(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_sync_updates_drifted_router_files(self, tmp_path, init_project):
         (tmp_path / "CLAUDE.md").write_text("custom", encoding="utf-8")
         (tmp_path / ".github" / "copilot-instructions.md").unlink()
 
@@ -576,32 +541,22 @@ class TestCmdSync:
             encoding="utf-8"
         ) == template_copilot
 
-    def test_sync_check_exits_1_on_drift(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_sync_check_exits_1_on_drift(self, tmp_path, init_project):
         (tmp_path / "GEMINI.md").write_text("drift", encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_sync(make_sync_args(check=True))
-        assert exc.value.code == 1
 
-    def test_sync_check_exits_0_when_in_sync(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
-        with pytest.raises(SystemExit) as exc:
+    def test_sync_check_exits_0_when_in_sync(self, init_project):
+        with expect_exit(0):
             cli.cmd_sync(make_sync_args(check=True))
-        assert exc.value.code == 0
 
     def test_sync_requires_agents_md(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_sync(make_sync_args())
-        assert exc.value.code == 1
 
-    def test_sync_diff_shows_changes(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_sync_diff_shows_changes(self, tmp_path, init_project, capsys):
         (tmp_path / "CLAUDE.md").write_text("custom content\n", encoding="utf-8")
 
         cli.cmd_sync(make_sync_args(diff=True))
@@ -611,10 +566,7 @@ class TestCmdSync:
         assert "+++ b/CLAUDE.md" in out
         assert "-custom content" in out
 
-    def test_sync_diff_no_output_when_in_sync(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_sync_diff_no_output_when_in_sync(self, init_project, capsys):
         cli.cmd_sync(make_sync_args(diff=True))
 
         out = capsys.readouterr().out
@@ -622,23 +574,20 @@ class TestCmdSync:
         assert "+++" not in out
 
     def test_sync_check_diff_shows_diff_and_exits_1(
-        self, tmp_path, monkeypatch, capsys
+        self, tmp_path, init_project, capsys
     ):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         (tmp_path / "GEMINI.md").write_text("drift\n", encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_sync(make_sync_args(check=True, diff=True))
-        assert exc.value.code == 1
 
         out = capsys.readouterr().out
         assert "--- a/GEMINI.md" in out
         assert "+++ b/GEMINI.md" in out
 
-    def test_sync_diff_missing_file_shows_dev_null(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_sync_diff_missing_file_shows_dev_null(
+        self, tmp_path, init_project, capsys
+    ):
         (tmp_path / ".github" / "copilot-instructions.md").unlink()
 
         cli.cmd_sync(make_sync_args(diff=True))
@@ -647,17 +596,16 @@ class TestCmdSync:
         assert "--- /dev/null" in out
         assert "+++ b/.github/copilot-instructions.md" in out
 
-    def test_sync_command_from_main_with_root(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_sync_command_from_main_with_root(
+        self, tmp_path, init_project, monkeypatch
+    ):
         (tmp_path / "CLAUDE.md").write_text("drift", encoding="utf-8")
         monkeypatch.setattr(
             sys, "argv", ["agentinit", "sync", "--root", str(tmp_path), "--check"]
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.main()
-        assert exc.value.code == 1
 
 
 class TestCmdDoctor:
@@ -668,18 +616,14 @@ class TestCmdDoctor:
         out = capsys.readouterr().out
         assert "All checks passed" in out
 
-    def test_reports_missing_files(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_reports_missing_files(self, tmp_path, init_project, capsys):
         (tmp_path / "GEMINI.md").unlink()
         cli.cmd_doctor(make_doctor_args())
         out = capsys.readouterr().out
         assert "GEMINI.md is missing" in out
         assert "agentinit init" in out
 
-    def test_missing_router_not_reported_twice(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_missing_router_not_reported_twice(self, tmp_path, init_project, capsys):
         (tmp_path / "CLAUDE.md").unlink()
         capsys.readouterr()  # discard init output
         cli.cmd_doctor(make_doctor_args())
@@ -687,26 +631,20 @@ class TestCmdDoctor:
         # Should report "missing" once, not also "missing (router)" or "out of sync"
         assert out.count("CLAUDE.md") == 1
 
-    def test_reports_sync_drift(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_reports_sync_drift(self, tmp_path, init_project, capsys):
         (tmp_path / "CLAUDE.md").write_text("custom", encoding="utf-8")
         cli.cmd_doctor(make_doctor_args())
         out = capsys.readouterr().out
         assert "CLAUDE.md is out of sync" in out
         assert "agentinit sync" in out
 
-    def test_reports_llms_unconfigured(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_reports_llms_unconfigured(self, init_project, capsys):
         cli.cmd_doctor(make_doctor_args())
         out = capsys.readouterr().out
         assert "llms.txt has unconfigured fields" in out
         assert "agentinit refresh-llms" in out
 
-    def test_quick_fixes_summary(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_quick_fixes_summary(self, tmp_path, init_project, capsys):
         (tmp_path / "CLAUDE.md").write_text("custom", encoding="utf-8")
         cli.cmd_doctor(make_doctor_args())
         out = capsys.readouterr().out
@@ -738,19 +676,24 @@ class TestMain:
 
     def test_help_flag(self, monkeypatch, capsys):
         monkeypatch.setattr(sys, "argv", ["agentinit", "--help"])
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.main()
-        assert exc.value.code == 0
 
     def test_version_flag(self, monkeypatch, capsys):
-        import re
-
         monkeypatch.setattr(sys, "argv", ["agentinit", "--version"])
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.main()
-        assert exc.value.code == 0
         out = capsys.readouterr().out.strip()
-        assert re.match(r"\d+\.\d+\.\d+", out), f"expected semver, got {out!r}"
+        assert _SEMVER_RE.match(out), f"expected semver, got {out!r}"
+
+    def test_repo_shim_version(self, monkeypatch, capsys):
+        shim = Path(__file__).resolve().parent.parent / "cli" / "agentinit.py"
+        monkeypatch.syspath_prepend(str(shim.parent))
+        monkeypatch.setattr(sys, "argv", [str(shim), "--version"])
+        with expect_exit(0):
+            runpy.run_path(str(shim), run_name="__main__")
+        out = capsys.readouterr().out.strip()
+        assert out == "dev" or _SEMVER_RE.match(out), f"unexpected version {out!r}"
 
     def test_refresh_llms_command(self, tmp_path, monkeypatch, capsys):
         monkeypatch.chdir(tmp_path)
@@ -771,15 +714,20 @@ class TestMain:
 
 class TestResolvesWithin:
     def test_inside(self, tmp_path):
-        assert cli._resolves_within(str(tmp_path), str(tmp_path / "sub"))
+        root = os.path.realpath(tmp_path)
+        assert cli._resolves_within(root, str(tmp_path / "sub"))
+
+    def test_sibling_with_shared_prefix(self, tmp_path):
+        root = os.path.realpath(tmp_path / "proj")
+        assert not cli._resolves_within(root, str(tmp_path / "proj-other"))
 
     def test_outside(self, tmp_path):
-        assert not cli._resolves_within(str(tmp_path), "/tmp")
+        assert not cli._resolves_within(os.path.realpath(tmp_path), "/tmp")
 
     def test_symlink_escape(self, tmp_path):
         escape = tmp_path / "escape"
         escape.symlink_to("/tmp")
-        assert not cli._resolves_within(str(tmp_path), str(escape))
+        assert not cli._resolves_within(os.path.realpath(tmp_path), str(escape))
 
 
 class TestEdgeCases:
@@ -806,74 +754,48 @@ class TestEdgeCases:
     def test_new_dest_is_file_not_dir(self, tmp_path):
         (tmp_path / "myproj").write_text("i am a file")
         args = make_args(name="myproj", dir=str(tmp_path))
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_new(args)
-        assert exc.value.code == 1
 
-    def test_force_overwrite_readonly_file(self, tmp_path):
-        cli.copy_template(str(tmp_path))
-        agents = tmp_path / "AGENTS.md"
-        agents.chmod(0o444)
-        try:
-            # shutil.copy2 overwrites read-only files on POSIX
-            copied, _ = cli.copy_template(str(tmp_path), force=True)
-            assert "AGENTS.md" in copied
-        finally:
-            agents.chmod(0o644)  # restore for cleanup
-
-    def test_force_copy_permission_denied_no_dst(self, tmp_path, monkeypatch, capsys):
-        """force=True should skip gracefully when dst doesn't exist and write fails."""
-        from unittest.mock import patch
+    def test_force_overwrite_readonly_file(self, seeded_tmp_path):
+        # A read-only destination is chmod'ed and rewritten
+        with file_mode(seeded_tmp_path / "AGENTS.md", 0o444):
+            copied, _ = cli.copy_template(str(seeded_tmp_path), force=True)
+        assert "AGENTS.md" in copied
 
-        cli.copy_template(str(tmp_path))
-        # Remove AGENTS.md so dst won't exist, then make copy2 always fail
-        (tmp_path / "AGENTS.md").unlink()
-        original_copy2 = __import__("shutil").copy2
+    def test_force_copy_permission_denied_no_dst(
+        self, seeded_tmp_path, monkeypatch, capsys
+    ):
+        """force=True should skip gracefully when dst doesn't exist and write fails."""
+        # Remove AGENTS.md so dst won't exist, then make the copy always fail
+        (seeded_tmp_path / "AGENTS.md").unlink()
+        original_fastcopy = _scaffold._fastcopy
 
-        def fail_copy2(src, dst, **kw):
+        def fail_fastcopy(src, dst):
             if "AGENTS.md" in str(dst):
                 raise PermissionError("simulated write failure")
-            return original_copy2(src, dst, **kw)
+            return original_fastcopy(src, dst)
 
-        with patch("shutil.copy2", side_effect=fail_copy2):
-            copied, skipped = cli.copy_template(str(tmp_path), force=True)
+        with patch("agentinit._scaffold._fastcopy", side_effect=fail_fastcopy):
+            copied, skipped = cli.copy_template(str(seeded_tmp_path), force=True)
         assert "AGENTS.md" in skipped
         assert "AGENTS.md" not in copied
         assert "permission denied" in capsys.readouterr().err
 
-    def test_remove_readonly_file(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_remove_readonly_file(self, tmp_path, init_project):
         agents = tmp_path / "AGENTS.md"
-        agents.chmod(0o444)
-        try:
-            cli.cmd_remove(make_remove_args())
-            assert not agents.exists()
-        except SystemExit:
-            agents.chmod(0o644)
-            pytest.fail("cmd_remove should handle read-only files")
-
-    def test_archive_twice_no_collision(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-        cli.cmd_remove(make_remove_args(archive=True))
-        # Re-init and archive again
-        cli.cmd_init(make_init_args())
-        cli.cmd_remove(make_remove_args(archive=True))
-        archives = list((tmp_path / ".agentinit-archive").iterdir())
-        assert len(archives) >= 2
-
-    def test_remove_keyboard_interrupt_aborts(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        import builtins
-
-        monkeypatch.setattr(
-            builtins,
-            "input",
-            lambda _prompt="": (_ for _ in ()).throw(KeyboardInterrupt),
-        )
+        with file_mode(agents, 0o444):
+            try:
+                cli.cmd_remove(make_remove_args())
+            except SystemExit:
+                pytest.fail("cmd_remove should handle read-only files")
+        assert not agents.exists()
+
+    @pytest.mark.usefixtures("tty_stdin")
+    def test_remove_keyboard_interrupt_aborts(
+        self, tmp_path, init_project, capsys, fake_input
+    ):
+        fake_input(KeyboardInterrupt)
         cli.cmd_remove(make_remove_args(force=False))
         assert "Aborted" in capsys.readouterr().out
         # Files should still exist (removal was aborted)
@@ -881,10 +803,8 @@ class TestEdgeCases:
 
 
 class TestVersionFallback:
-    def test_version_fallback_when_not_installed(self, monkeypatch):
+    def test_version_fallback_when_not_installed(self, monkeypatch, capsys):
         """build_parser should not crash when package is not installed."""
-        import importlib.metadata
-
         original = importlib.metadata.version
 
         def fake_version(name):
@@ -896,16 +816,16 @@ class TestVersionFallback:
         parser = cli.build_parser()
         assert parser is not None
         # --version should show "dev"
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             parser.parse_args(["--version"])
-        assert exc.value.code == 0
+        assert capsys.readouterr().out.strip() == "dev"
 
 
 class TestWizardPurposeSkip:
+    @pytest.mark.usefixtures("tty_stdin")
     def test_purpose_skips_wizard_on_tty(self, tmp_path, monkeypatch):
         """--purpose should not trigger the wizard even on a TTY."""
         monkeypatch.chdir(tmp_path)
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
         monkeypatch.setattr(
             sys, "argv", ["agentinit", "init", "--purpose", "My project"]
         )
@@ -921,10 +841,10 @@ class TestWizardPurposeSkip:
         out = capsys.readouterr().out
         assert "Run with --prompt to fill interactively." in out
 
+    @pytest.mark.usefixtures("non_tty_stdin")
     def test_no_wizard_no_purpose_no_tty(self, tmp_path, monkeypatch):
         """Without TTY and without --purpose, wizard should not run."""
         monkeypatch.chdir(tmp_path)
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: False)
         monkeypatch.setattr(sys, "argv", ["agentinit", "init"])
         cli.main()
         assert (tmp_path / "AGENTS.md").exists()
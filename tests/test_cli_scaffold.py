@@ -1,6 +1,7 @@
 """Tests for scaffold operations (copy_template, write_todo, apply_updates, refresh_llms)."""
 
-import sys
+import errno
+import os
 from pathlib import Path
 
 import pytest
@@ -8,8 +9,10 @@ import pytest
 import agentinit.cli as cli
 from agentinit.contextlint_adapter import get_checks_module
 from tests.helpers import (
+    expect_exit,
     make_args,
     make_init_args,
+    write_file,
 )
 
 
@@ -20,24 +23,21 @@ class TestCopyTemplate:
         assert (tmp_path / "AGENTS.md").exists()
         assert (tmp_path / "docs" / "PROJECT.md").exists()
 
-    def test_skips_existing_without_force(self, tmp_path):
-        cli.copy_template(str(tmp_path))
-        copied, skipped = cli.copy_template(str(tmp_path))
+    def test_skips_existing_without_force(self, seeded_tmp_path):
+        copied, skipped = cli.copy_template(str(seeded_tmp_path))
         assert copied == []
         assert len(skipped) > 0
 
-    def test_overwrites_with_force(self, tmp_path):
-        cli.copy_template(str(tmp_path))
-        (tmp_path / "AGENTS.md").write_text("custom")
-        copied, _ = cli.copy_template(str(tmp_path), force=True)
+    def test_overwrites_with_force(self, seeded_tmp_path):
+        (seeded_tmp_path / "AGENTS.md").write_text("custom")
+        copied, _ = cli.copy_template(str(seeded_tmp_path), force=True)
         assert "AGENTS.md" in copied
-        assert (tmp_path / "AGENTS.md").read_text() != "custom"
+        assert (seeded_tmp_path / "AGENTS.md").read_text() != "custom"
 
-    def test_gitignore_never_overwritten(self, tmp_path):
-        cli.copy_template(str(tmp_path))
-        (tmp_path / ".gitignore").write_text("custom")
-        cli.copy_template(str(tmp_path), force=True)
-        assert (tmp_path / ".gitignore").read_text() == "custom"
+    def test_gitignore_never_overwritten(self, seeded_tmp_path):
+        (seeded_tmp_path / ".gitignore").write_text("custom")
+        cli.copy_template(str(seeded_tmp_path), force=True)
+        assert (seeded_tmp_path / ".gitignore").read_text() == "custom"
 
     def test_skips_symlink_destination(self, tmp_path):
         target = tmp_path / "target"
@@ -47,14 +47,53 @@ class TestCopyTemplate:
         _, skipped = cli.copy_template(str(tmp_path))
         assert "AGENTS.md" in skipped
 
-    def test_empty_template_dir(self, tmp_path, monkeypatch):
-        fake = tmp_path / "empty_template"
-        fake.mkdir()
-        monkeypatch.setattr(cli, "TEMPLATE_DIR", str(fake))
+    def test_force_skips_symlink_destination_outside_project(self, tmp_path):
+        outside = tmp_path / "outside.md"
+        outside.write_text("keep")
+        project = tmp_path / "proj"
+        project.mkdir()
+        (project / "AGENTS.md").symlink_to(outside)
+        copied, skipped = cli.copy_template(str(project), force=True)
+        assert "AGENTS.md" in skipped
+        assert "AGENTS.md" not in copied
+        assert outside.read_text() == "keep"
+
+    @pytest.mark.usefixtures("empty_template_dir")
+    def test_empty_template_dir(self, tmp_path):
         copied, skipped = cli.copy_template(str(tmp_path / "dest"))
         assert copied == []
         assert skipped == []
 
+    def test_copy_falls_back_when_copy_file_range_unsupported(
+        self, tmp_path, monkeypatch
+    ):
+        def unsupported(*args, **kwargs):
+            raise OSError(errno.EXDEV, "copy_file_range not supported")
+
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+        copied, _ = cli.copy_template(str(tmp_path))
+        assert "AGENTS.md" in copied
+        assert (tmp_path / "AGENTS.md").read_bytes() == (
+            Path(cli.TEMPLATE_DIR) / "AGENTS.md"
+        ).read_bytes()
+
+    def test_copy_propagates_real_copy_file_range_errors(self, tmp_path, monkeypatch):
+        def io_error(*args, **kwargs):
+            raise OSError(errno.EIO, "I/O error")
+
+        monkeypatch.setattr(os, "copy_file_range", io_error, raising=False)
+        with pytest.raises(OSError) as exc:
+            cli.copy_template(str(tmp_path))
+        assert exc.value.errno == errno.EIO
+
+    def test_copy_uses_copy2_without_copy_file_range(self, tmp_path, monkeypatch):
+        monkeypatch.delattr(os, "copy_file_range", raising=False)
+        copied, _ = cli.copy_template(str(tmp_path))
+        assert "AGENTS.md" in copied
+        assert (tmp_path / "AGENTS.md").read_bytes() == (
+            Path(cli.TEMPLATE_DIR) / "AGENTS.md"
+        ).read_bytes()
+
     def test_copy_skeleton_skips_transient_cache_and_build_artifacts(
         self, tmp_path, monkeypatch
     ):
@@ -100,64 +139,57 @@ class TestCopyTemplate:
         assert duplicate_messages == []
 
 
-class TestWriteTodo:
-    def test_creates_file(self, tmp_path):
-        cli.write_todo(str(tmp_path))
-        assert (tmp_path / "docs" / "TODO.md").exists()
-        content = (tmp_path / "docs" / "TODO.md").read_text(encoding="utf-8")
-        assert "# TODO" in content
+@pytest.mark.parametrize(
+    ("writer", "filename", "header"),
+    [
+        (cli.write_todo, "TODO.md", "# TODO"),
+        (cli.write_decisions, "DECISIONS.md", "# Decisions"),
+    ],
+    ids=["todo", "decisions"],
+)
+class TestWriteDocStub:
+    def test_creates_file(self, tmp_path, writer, filename, header):
+        writer(str(tmp_path))
+        content = (tmp_path / "docs" / filename).read_text(encoding="utf-8")
+        assert header in content
 
-    def test_creates_docs_dir(self, tmp_path):
+    def test_creates_docs_dir(self, tmp_path, writer, filename, header):
         dest = tmp_path / "sub"
         dest.mkdir()
-        cli.write_todo(str(dest))
-        assert (dest / "docs" / "TODO.md").exists()
-
-    def test_skips_existing_without_force(self, tmp_path, capsys):
-        docs = tmp_path / "docs"
-        docs.mkdir()
-        (docs / "TODO.md").write_text("my stuff")
-        cli.write_todo(str(tmp_path), force=False)
-        assert (docs / "TODO.md").read_text() == "my stuff"
-        assert "already exists" in capsys.readouterr().err
+        writer(str(dest))
+        assert (dest / "docs" / filename).exists()
 
-    def test_overwrites_with_force(self, tmp_path):
-        docs = tmp_path / "docs"
-        docs.mkdir()
-        (docs / "TODO.md").write_text("my stuff")
-        cli.write_todo(str(tmp_path), force=True)
-        assert "# TODO" in (docs / "TODO.md").read_text()
-
-
-class TestWriteDecisions:
-    def test_creates_file(self, tmp_path):
-        cli.write_decisions(str(tmp_path))
-        path = tmp_path / "docs" / "DECISIONS.md"
-        assert path.exists()
-        assert "# Decisions" in path.read_text(encoding="utf-8")
-
-    def test_skips_existing_without_force(self, tmp_path, capsys):
-        docs = tmp_path / "docs"
-        docs.mkdir()
-        (docs / "DECISIONS.md").write_text("keep")
-        cli.write_decisions(str(tmp_path), force=False)
-        assert (docs / "DECISIONS.md").read_text() == "keep"
+    def test_skips_existing_without_force(
+        self, tmp_path, capsys, writer, filename, header
+    ):
+        existing = write_file(tmp_path, f"docs/{filename}", "my stuff")
+        writer(str(tmp_path), force=False)
+        assert existing.read_text() == "my stuff"
         assert "already exists" in capsys.readouterr().err
 
-    def test_overwrites_with_force(self, tmp_path):
-        docs = tmp_path / "docs"
-        docs.mkdir()
-        (docs / "DECISIONS.md").write_text("old")
-        cli.write_decisions(str(tmp_path), force=True)
-        assert "# Decisions" in (docs / "DECISIONS.md").read_text()
+    def test_overwrites_with_force(self, tmp_path, writer, filename, header):
+        existing = write_file(tmp_path, f"docs/{filename}", "my stuff")
+        writer(str(tmp_path), force=True)
+        assert header in existing.read_text()
+
+
+@pytest.fixture
+def run_wizard(seeded_tmp_path, fake_input, tty_stdin):
+    """Run the interactive apply_updates wizard on a seeded project."""
+
+    def run(*answers, purpose="Test project"):
+        fake_input(*answers)
+        cli.apply_updates(str(seeded_tmp_path), make_args(prompt=True, purpose=purpose))
+        return seeded_tmp_path
+
+    return run
 
 
 class TestApplyUpdates:
-    def test_replaces_placeholder(self, tmp_path):
-        cli.copy_template(str(tmp_path))
+    def test_replaces_placeholder(self, seeded_tmp_path):
         args = make_args(purpose="My awesome project", prompt=False)
-        cli.apply_updates(str(tmp_path), args)
-        content = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        cli.apply_updates(str(seeded_tmp_path), args)
+        content = (seeded_tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert "My awesome project" in content
         assert "Describe what this project is for" not in content
 
@@ -166,140 +198,100 @@ class TestApplyUpdates:
         cli.apply_updates(str(tmp_path), args)
         assert "not a regular file" in capsys.readouterr().err
 
-    def test_prompt_fails_if_not_tty(self, tmp_path, monkeypatch, capsys):
-        cli.copy_template(str(tmp_path))
+    @pytest.mark.usefixtures("non_tty_stdin")
+    def test_prompt_fails_if_not_tty(self, seeded_tmp_path, capsys):
         args = make_args(prompt=True)
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: False)
-        with pytest.raises(SystemExit) as exc:
-            cli.apply_updates(str(tmp_path), args)
-        assert exc.value.code == 1
+        with expect_exit(1):
+            cli.apply_updates(str(seeded_tmp_path), args)
         err = capsys.readouterr().err
         assert "requires an interactive terminal" in err
         assert "--purpose" in err
 
-    def test_wizard_injects_safe_defaults_after_heading(self, tmp_path, monkeypatch):
+    def test_wizard_injects_safe_defaults_after_heading(self, run_wizard):
         """Safe Defaults block should be inserted after # Conventions heading, not prepended."""
-        cli.copy_template(str(tmp_path))
-        args = make_args(prompt=True, purpose="Test project")
-        # Simulate wizard inputs: env, constraints, commands (all empty for this test)
-        inputs = iter(["", "", ""])
-        monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        cli.apply_updates(str(tmp_path), args)
+        # Wizard inputs: env, constraints, commands (all empty for this test)
+        project = run_wizard("", "", "")
+
+        content = (project / "docs" / "CONVENTIONS.md").read_text(encoding="utf-8")
+        # Anchor on newlines so each lookup matches a whole heading line.
+        padded = f"\n{content}\n"
+        positions = {}
+        for heading in ("# Conventions", "## Safe Defaults", "## Style"):
+            pos = padded.find(f"\n{heading}\n")
+            assert pos != -1, f"Should have {heading} heading"
+            positions[heading] = pos
 
-        content = (tmp_path / "docs" / "CONVENTIONS.md").read_text(encoding="utf-8")
-        lines = content.splitlines()
-
-        # Find positions of key headings
-        conventions_idx = None
-        safe_defaults_idx = None
-        style_idx = None
-        for i, line in enumerate(lines):
-            if line == "# Conventions":
-                conventions_idx = i
-            elif line == "## Safe Defaults":
-                safe_defaults_idx = i
-            elif line == "## Style":
-                style_idx = i
-
-        assert conventions_idx is not None, "Should have # Conventions heading"
-        assert safe_defaults_idx is not None, "Should have ## Safe Defaults heading"
-        assert style_idx is not None, "Should have ## Style heading"
         # Safe Defaults should be AFTER # Conventions and BEFORE ## Style
-        assert conventions_idx < safe_defaults_idx < style_idx, (
-            f"Safe Defaults should be between # Conventions and ## Style, got positions: "
-            f"Conventions={conventions_idx}, SafeDefaults={safe_defaults_idx}, Style={style_idx}"
+        assert (
+            positions["# Conventions"]
+            < positions["## Safe Defaults"]
+            < positions["## Style"]
+        ), (
+            f"Safe Defaults should be between # Conventions and ## Style, got {positions}"
         )
 
-    def test_wizard_env_replaces_existing_section_without_duplication(
-        self, tmp_path, monkeypatch
-    ):
-        cli.copy_template(str(tmp_path))
-        args = make_args(prompt=True, purpose="Test project")
+    def test_wizard_env_replaces_existing_section_without_duplication(self, run_wizard):
+        run_wizard("Linux x86_64", "", "")
+        project = run_wizard("Linux ARM64", "", "")
 
-        inputs = iter(["Linux x86_64", "", ""])
-        monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        cli.apply_updates(str(tmp_path), args)
-
-        inputs = iter(["Linux ARM64", "", ""])
-        monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-        cli.apply_updates(str(tmp_path), args)
-
-        content = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        content = (project / "docs" / "PROJECT.md").read_text(encoding="utf-8")
 
         assert content.count("## Environment") == 1
         assert "- OS/device: Linux ARM64" in content
         assert "- OS/device: Linux x86_64" not in content
 
-    def test_wizard_env_inserts_before_stack(self, tmp_path, monkeypatch):
+    def test_wizard_env_inserts_before_stack(self, run_wizard):
         """Wizard environment should be inserted before ## Stack."""
-        cli.copy_template(str(tmp_path))
-        args = make_args(prompt=True, purpose="Test project")
-        inputs = iter(["Linux x86_64", "", ""])
-        monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        cli.apply_updates(str(tmp_path), args)
+        project = run_wizard("Linux x86_64", "", "")
 
-        content = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        content = (project / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert "## Environment" in content
         assert "- OS/device: Linux x86_64" in content
         env_pos = content.index("## Environment")
         stack_pos = content.index("## Stack")
         assert env_pos < stack_pos
 
-    def test_wizard_constraints_replaces_placeholders(self, tmp_path, monkeypatch):
+    def test_wizard_constraints_replaces_placeholders(self, run_wizard):
         """Wizard constraints should replace the template constraint placeholders."""
-        cli.copy_template(str(tmp_path))
-        args = make_args(prompt=True, purpose="Test project")
-        inputs = iter(["", "No external API calls", ""])
-        monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        cli.apply_updates(str(tmp_path), args)
+        project = run_wizard("", "No external API calls", "")
 
-        content = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        content = (project / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert "- No external API calls" in content
         assert "**Security:** (not configured)" not in content
 
-    def test_wizard_safe_defaults_not_duplicated(self, tmp_path, monkeypatch):
+    def test_wizard_safe_defaults_not_duplicated(self, run_wizard):
         """Running wizard multiple times should inject Safe Defaults only once."""
-        cli.copy_template(str(tmp_path))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-
-        args = make_args(prompt=True, purpose=None)
         for purpose in ("First run", "Second run"):
-            inputs = iter([purpose, "", "", ""])
-            monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-            cli.apply_updates(str(tmp_path), args)
+            project = run_wizard(purpose, "", "", "", purpose=None)
 
-        content = (tmp_path / "docs" / "CONVENTIONS.md").read_text(encoding="utf-8")
+        content = (project / "docs" / "CONVENTIONS.md").read_text(encoding="utf-8")
         assert content.count("## Safe Defaults") == 1
 
-    def test_non_english_purpose_warns(self, tmp_path, capsys):
-        cli.copy_template(str(tmp_path))
+    def test_non_english_purpose_warns(self, seeded_tmp_path, capsys):
         args = make_args(
             purpose="Una semplice API REST per gestire todo list con FastAPI + SQLite",
             prompt=False,
         )
-        cli.apply_updates(str(tmp_path), args)
+        cli.apply_updates(str(seeded_tmp_path), args)
         err = capsys.readouterr().err
         assert "appears non-English" in err
 
-    def test_translate_purpose_flag_translates_project_and_llms(self, tmp_path, capsys):
-        cli.copy_template(str(tmp_path))
+    def test_translate_purpose_flag_translates_project_and_llms(
+        self, seeded_tmp_path, capsys
+    ):
         args = make_args(
             purpose="Una semplice API REST per gestire todo list con FastAPI + SQLite",
             prompt=False,
             translate_purpose=True,
         )
-        cli.apply_updates(str(tmp_path), args)
+        cli.apply_updates(str(seeded_tmp_path), args)
 
-        project = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        project = (seeded_tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert (
             "**Purpose:** A simple REST API to manage a todo list with FastAPI + SQLite"
             in project
         )
-        llms = (tmp_path / "llms.txt").read_text(encoding="utf-8")
+        llms = (seeded_tmp_path / "llms.txt").read_text(encoding="utf-8")
         assert llms.splitlines()[0] == (
             "# A simple REST API to manage a todo list with FastAPI + SQLite"
         )
@@ -310,15 +302,14 @@ class TestApplyUpdates:
         out = capsys.readouterr().out
         assert "Purpose translated to English for docs/*" in out
 
-    def test_detect_auto_translates_romance_purpose(self, tmp_path):
-        cli.copy_template(str(tmp_path))
+    def test_detect_auto_translates_romance_purpose(self, seeded_tmp_path):
         args = make_args(
             purpose="Une API REST simple pour gerer une liste de taches avec FastAPI + SQLite",
             prompt=False,
             detect=True,
         )
-        cli.apply_updates(str(tmp_path), args)
-        project = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        cli.apply_updates(str(seeded_tmp_path), args)
+        project = (seeded_tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert (
             "A simple REST API to manage a todo list with FastAPI + SQLite" in project
         )
@@ -423,14 +414,13 @@ class TestRefreshLlms:
         assert elapsed < 1.0
         assert llms.splitlines()[1] == "> Python >=3.11 project."
 
-    def test_skips_symlink_destination(self, tmp_path, capsys):
-        outside = tmp_path / "outside"
+    def test_skips_symlink_destination(self, seeded_tmp_path, capsys):
+        outside = seeded_tmp_path / "outside"
         outside.mkdir()
-        cli.copy_template(str(tmp_path))
-        (tmp_path / "llms.txt").unlink()
-        (tmp_path / "llms.txt").symlink_to(outside / "llms.txt")
+        (seeded_tmp_path / "llms.txt").unlink()
+        (seeded_tmp_path / "llms.txt").symlink_to(outside / "llms.txt")
 
-        elapsed = cli.refresh_llms_txt(str(tmp_path))
+        elapsed = cli.refresh_llms_txt(str(seeded_tmp_path))
 
         assert elapsed is None
         assert not (outside / "llms.txt").exists()
@@ -1,14 +1,17 @@
 """Tests for status, detect, and template packaging."""
 
+import builtins
 import json
 import os
-import sys
 
 import pytest
 
 import agentinit.cli as cli
 from tests.helpers import (
+    expect_exit,
+    file_mode,
     fill_tbd,
+    list_files,
     make_args,
     make_init_args,
     make_status_args,
@@ -16,10 +19,8 @@ from tests.helpers import (
 
 
 class TestCmdStatus:
-    def test_all_present_and_filled(self, tmp_path, monkeypatch, capsys):
+    def test_all_present_and_filled(self, tmp_path, init_project, capsys):
         """When all files exist and none contain TBD, reports 'Ready'."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         cli.cmd_status(make_status_args())
         out = capsys.readouterr().out
@@ -33,10 +34,8 @@ class TestCmdStatus:
         assert "missing" in out
         assert "Action required" in out
 
-    def test_tbd_files_reported(self, tmp_path, monkeypatch, capsys):
+    def test_tbd_files_reported(self, tmp_path, init_project, capsys):
         """Files containing TBD are flagged as incomplete."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         # Inject TBD manually (templates no longer contain TBD by default)
         (tmp_path / "AGENTS.md").write_text(
             "# Agents\n\nSetup: TBD\n", encoding="utf-8"
@@ -49,16 +48,13 @@ class TestCmdStatus:
     def test_check_exits_1_when_issues(self, tmp_path, monkeypatch):
         """--check should exit with code 1 when files are missing."""
         monkeypatch.chdir(tmp_path)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
 
     def test_check_exits_1_when_contextlint_unavailable(
-        self, tmp_path, monkeypatch, capsys
+        self, tmp_path, init_project, monkeypatch, capsys
     ):
         """--check should fail closed when contextlint cannot be loaded."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
 
         def _boom():
@@ -66,20 +62,16 @@ class TestCmdStatus:
 
         monkeypatch.setattr("agentinit.contextlint_adapter.get_checks_module", _boom)
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         err = capsys.readouterr().err
         assert "contextlint checks unavailable" in err
 
-    def test_check_exits_0_when_ready(self, tmp_path, monkeypatch, capsys):
+    def test_check_exits_0_when_ready(self, tmp_path, init_project, capsys):
         """--check should exit with code 0 when everything is filled."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "Ready" in out
 
@@ -96,9 +88,8 @@ class TestCmdStatus:
         monkeypatch.chdir(tmp_path)
         cli.cmd_init(make_init_args(minimal=True))
         fill_tbd(tmp_path, cli.MINIMAL_MANAGED_FILES)
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(minimal=True, check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "Ready" in out
         assert "Broken reference" not in out
@@ -114,10 +105,9 @@ class TestCmdStatus:
             encoding="utf-8",
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(minimal=True, check=True))
 
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "docs/GUIDE.md" not in out
         assert "Ready" in out
@@ -130,9 +120,8 @@ class TestCmdStatus:
         cli.cmd_init(make_init_args(minimal=True))
         fill_tbd(tmp_path, cli.MINIMAL_MANAGED_FILES)
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "Profile: minimal (auto-detected)" in out
         assert "Ready" in out
@@ -166,19 +155,15 @@ class TestCmdStatus:
             encoding="utf-8",
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
         assert "Profile: minimal" not in out
         assert "Action required" in out
 
     def test_full_project_note_with_minimal_phrase_does_not_trigger_auto_detect(
-        self, tmp_path, monkeypatch, capsys
+        self, tmp_path, init_project, capsys
     ):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
         agents = tmp_path / "AGENTS.md"
         agents.write_text(
             agents.read_text(encoding="utf-8")
@@ -187,30 +172,26 @@ class TestCmdStatus:
         )
         (tmp_path / "GEMINI.md").unlink()
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
         assert "Profile: minimal" not in out
         assert "GEMINI.md (missing)" in out
 
-    def test_unreadable_file(self, tmp_path, monkeypatch, capsys):
+    @pytest.mark.skipif(
+        hasattr(os, "geteuid") and os.geteuid() == 0,
+        reason="root can read mode-000 files",
+    )
+    def test_unreadable_file(self, tmp_path, init_project, capsys):
         """Files that can't be read are reported as unreadable."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-        agents = tmp_path / "AGENTS.md"
-        agents.chmod(0o000)
-        try:
+        with file_mode(tmp_path / "AGENTS.md", 0o000):
             cli.cmd_status(make_status_args())
-            out = capsys.readouterr().out
-            assert "unreadable" in out
-        finally:
-            agents.chmod(0o644)
+        out = capsys.readouterr().out
+        # Match the status line; tmp_path itself contains "unreadable".
+        assert "x AGENTS.md (unreadable)" in out
 
-    def test_broken_symlink(self, tmp_path, monkeypatch, capsys):
+    def test_broken_symlink(self, tmp_path, init_project, capsys):
         """A dangling symlink is reported as 'broken symlink'."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         agents = tmp_path / "AGENTS.md"
         agents.unlink()
         agents.symlink_to(tmp_path / "nonexistent")
@@ -218,10 +199,8 @@ class TestCmdStatus:
         out = capsys.readouterr().out
         assert "broken symlink" in out
 
-    def test_not_a_file(self, tmp_path, monkeypatch, capsys):
+    def test_not_a_file(self, tmp_path, init_project, capsys):
         """A directory where a file is expected is reported as 'not a file'."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         agents = tmp_path / "AGENTS.md"
         agents.unlink()
         agents.mkdir()
@@ -229,52 +208,49 @@ class TestCmdStatus:
         out = capsys.readouterr().out
         assert "not a file" in out
 
-    def test_soft_line_budget(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    @pytest.mark.parametrize(
+        ("lines", "code", "snippet"),
+        [(201, 0, "(201 lines >= 200)"), (301, 1, "(301 lines >= 300)")],
+        ids=["soft", "hard"],
+    )
+    def test_line_budget(self, tmp_path, init_project, capsys, lines, code, snippet):
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         agents = tmp_path / "AGENTS.md"
-        agents.write_text("line\n" * 201, encoding="utf-8")
+        agents.write_text("line\n" * lines, encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(code):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
-        assert "(201 lines >= 200)" in out
+        assert snippet in out
+        # Only the hard budget escalates to a contextlint "too large" error.
+        assert ("too large" in out) == (code == 1)
 
-    def test_contextlintrc_above_300_is_warning_only(
-        self, tmp_path, monkeypatch, capsys
+    def test_line_budget_counts_cr_only_line_endings(
+        self, tmp_path, init_project, capsys
     ):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
-        config = tmp_path / ".contextlintrc.json"
-        config.write_text("line\n" * 301, encoding="utf-8")
+        (tmp_path / "AGENTS.md").write_bytes(b"line\r" * 301)
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
-        assert ".contextlintrc.json (301 lines >= 200)" in out
-        assert "too large" not in out
+        assert "(301 lines >= 300)" in out
+        assert "too large" in out
 
-    def test_hard_line_budget(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_contextlintrc_above_300_is_warning_only(
+        self, tmp_path, init_project, capsys
+    ):
         fill_tbd(tmp_path, cli.MANAGED_FILES)
-        agents = tmp_path / "AGENTS.md"
-        agents.write_text("line\n" * 301, encoding="utf-8")
+        config = tmp_path / ".contextlintrc.json"
+        config.write_text("line\n" * 301, encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
-        assert "(301 lines >= 300)" in out
-        assert "too large" in out
+        assert ".contextlintrc.json (301 lines >= 200)" in out
+        assert "too large" not in out
 
-    def test_broken_reference(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_broken_reference(self, tmp_path, init_project, capsys):
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         agents = tmp_path / "AGENTS.md"
         agents.write_text(
@@ -282,19 +258,16 @@ class TestCmdStatus:
             encoding="utf-8",
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
         assert "Broken reference: docs/missing.md" in out
         assert "Broken reference: docs/also-missing.md" in out
 
     def test_broken_reference_no_false_positive_from_markdown(
-        self, tmp_path, monkeypatch, capsys
+        self, tmp_path, init_project, capsys
     ):
         """Markdown link syntax must not be reported as a second broken ref."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         agents = tmp_path / "AGENTS.md"
         agents.write_text(
@@ -302,17 +275,16 @@ class TestCmdStatus:
             encoding="utf-8",
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(1):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 1
         out = capsys.readouterr().out
         assert "Broken reference: docs/nope.md" in out
         assert out.count("Broken reference:") == 1
 
-    def test_gitignore_excluded_from_top_offenders(self, tmp_path, monkeypatch, capsys):
+    def test_gitignore_excluded_from_top_offenders(
+        self, tmp_path, init_project, capsys
+    ):
         """Ensure .gitignore is not listed in Top offenders even when it has many lines."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         fill_tbd(tmp_path, cli.MANAGED_FILES)
 
         (tmp_path / ".gitignore").write_text(
@@ -339,9 +311,7 @@ class TestCmdStatus:
             elif top_offenders_section and line.strip() and not line.startswith("  "):
                 break
 
-    def test_valid_reference(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_valid_reference(self, tmp_path, init_project, capsys):
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         agents = tmp_path / "AGENTS.md"
         agents.write_text(
@@ -349,23 +319,19 @@ class TestCmdStatus:
             encoding="utf-8",
         )
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "Broken reference" not in out
 
-    def test_outside_reference_ignored_no_crash(self, tmp_path, monkeypatch, capsys):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
+    def test_outside_reference_ignored_no_crash(self, tmp_path, init_project, capsys):
         fill_tbd(tmp_path, cli.MANAGED_FILES)
         agents = tmp_path / "AGENTS.md"
         # Test paths that resolve outside the root (should be ignored, not crash)
         agents.write_text("See `../secret.md` or `../../outside.txt`", encoding="utf-8")
 
-        with pytest.raises(SystemExit) as exc:
+        with expect_exit(0):
             cli.cmd_status(make_status_args(check=True))
-        assert exc.value.code == 0
         out = capsys.readouterr().out
         assert "Broken reference" not in out
 
@@ -392,9 +358,9 @@ class TestTemplatePackaging:
     ]
 
     def test_template_files_exist(self):
-        for rel in self.REQUIRED_TEMPLATES:
-            path = os.path.join(cli.TEMPLATE_DIR, rel)
-            assert os.path.isfile(path), f"Template file missing: {rel}"
+        shipped = set(list_files(cli.TEMPLATE_DIR))
+        missing = [rel for rel in self.REQUIRED_TEMPLATES if rel not in shipped]
+        assert not missing, f"Template files missing: {missing}"
 
     def test_new_templates_have_no_tbd(self):
         """None of the shipped templates should contain the literal string TBD."""
@@ -407,10 +373,7 @@ class TestTemplatePackaging:
 
 
 class TestDetectManifests:
-    def test_detect_node(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_detect_node(self, tmp_path, init_project):
         # Write fake package.json
 
         pkg = {"packageManager": "pnpm@8", "scripts": {"test": "jest", "dev": "vite"}}
@@ -425,10 +388,7 @@ class TestDetectManifests:
         assert "- Test: pnpm run test" in content
         assert "- Run: pnpm run dev" in content
 
-    def test_detect_go(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_detect_go(self, tmp_path, init_project):
         (tmp_path / "go.mod").write_text(
             "module myapp\n\ngo 1.22.1\n", encoding="utf-8"
         )
@@ -441,10 +401,7 @@ class TestDetectManifests:
         assert "- **Runtime:** Go 1.22.1" in content
         assert "- Test: go test ./..." in content
 
-    def test_detect_python_poetry(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_detect_python_poetry(self, tmp_path, init_project):
         toml = (
             '[project]\nrequires-python = ">=3.11"\n\n[tool.poetry]\nname = "myproj"\n'
         )
@@ -466,10 +423,7 @@ class TestDetectManifests:
         assert "- **Runtime:** Python >=3.11" in content
         assert "- Setup: poetry install" in content
 
-    def test_detect_no_manifests_leaves_tbd(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_detect_no_manifests_leaves_tbd(self, tmp_path, init_project):
         args = make_init_args(detect=True)
         cli.apply_updates(str(tmp_path), args)
 
@@ -478,11 +432,8 @@ class TestDetectManifests:
         assert "- Setup: (not configured)" in content
 
     def test_detect_from_purpose_fastapi_sqlite_prefills_project_and_conventions(
-        self, tmp_path, monkeypatch
+        self, tmp_path, init_project
     ):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
         args = make_init_args(
             detect=True,
             purpose="Build a REST API for todos with FastAPI and SQLite",
@@ -500,10 +451,7 @@ class TestDetectManifests:
         assert "Ruff (`ruff check .` + `ruff format .`)" in conventions
         assert "pytest" in conventions
 
-    def test_detect_from_purpose_prefers_uv_setup(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_detect_from_purpose_prefers_uv_setup(self, tmp_path, init_project):
         args = make_init_args(
             detect=True,
             purpose="FastAPI moderno con uv e uvicorn",
@@ -513,10 +461,7 @@ class TestDetectManifests:
         project = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert "- Setup: uv sync" in project
 
-    def test_detect_from_purpose_prefers_poetry_setup(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
+    def test_detect_from_purpose_prefers_poetry_setup(self, tmp_path, init_project):
         args = make_init_args(
             detect=True,
             purpose="Python service with poetry and FastAPI",
@@ -528,17 +473,15 @@ class TestDetectManifests:
 
 
 class TestDetectTomlWarning:
-    def test_warns_when_tomllib_unavailable(self, tmp_path, monkeypatch, capsys):
+    def test_warns_when_tomllib_unavailable(
+        self, tmp_path, init_project, monkeypatch, capsys
+    ):
         """Print warning when tomllib is missing and TOML manifests exist."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         (tmp_path / "pyproject.toml").write_text(
             '[project]\nname = "test"\n', encoding="utf-8"
         )
 
         # Simulate tomllib not being available
-        import builtins
-
         real_import = builtins.__import__
 
         def fake_import(name, *args, **kwargs):
@@ -556,13 +499,10 @@ class TestDetectTomlWarning:
         assert "pyproject.toml" in err
         assert "3.11" in err
 
-    def test_no_warning_without_toml_files(self, tmp_path, monkeypatch, capsys):
+    def test_no_warning_without_toml_files(
+        self, tmp_path, init_project, monkeypatch, capsys
+    ):
         """No warning when no TOML manifests exist."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
-
-        import builtins
-
         real_import = builtins.__import__
 
         def fake_import(name, *args, **kwargs):
@@ -580,16 +520,14 @@ class TestDetectTomlWarning:
 
 
 class TestCommandsMarkers:
-    def test_wizard_commands_replace_between_markers(self, tmp_path, monkeypatch):
+    @pytest.mark.usefixtures("tty_stdin")
+    def test_wizard_commands_replace_between_markers(self, seeded_tmp_path, fake_input):
         """Wizard commands should replace content between markers."""
-        cli.copy_template(str(tmp_path))
         args = make_args(prompt=True, purpose="Test project")
-        inputs = iter(["", "", "make build, make test, make run"])
-        monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-        monkeypatch.setattr(sys.stdin, "isatty", lambda: True)
-        cli.apply_updates(str(tmp_path), args)
+        fake_input("", "", "make build, make test, make run")
+        cli.apply_updates(str(seeded_tmp_path), args)
 
-        content = (tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
+        content = (seeded_tmp_path / "docs" / "PROJECT.md").read_text(encoding="utf-8")
         assert "- make build" in content
         assert "- make test" in content
         assert "- make run" in content
@@ -599,10 +537,9 @@ class TestCommandsMarkers:
         between = content[start:end]
         assert "(not configured)" not in between
 
-    def test_markers_survive_whitespace_changes(self, tmp_path):
+    def test_markers_survive_whitespace_changes(self, seeded_tmp_path):
         """Commands replacement works even with extra whitespace in template."""
-        cli.copy_template(str(tmp_path))
-        project_path = tmp_path / "docs" / "PROJECT.md"
+        project_path = seeded_tmp_path / "docs" / "PROJECT.md"
         content = project_path.read_text(encoding="utf-8")
         # Add extra whitespace around the commands section
         content = content.replace("## Commands\n", "## Commands\n\n")
@@ -615,10 +552,8 @@ class TestCommandsMarkers:
         assert "<!-- agentinit:commands:start -->" in result
         assert "<!-- agentinit:commands:end -->" in result
 
-    def test_detect_updates_within_markers(self, tmp_path, monkeypatch):
+    def test_detect_updates_within_markers(self, tmp_path, init_project):
         """--detect should update individual command lines within markers."""
-        monkeypatch.chdir(tmp_path)
-        cli.cmd_init(make_init_args())
         (tmp_path / "go.mod").write_text("module myapp\n\ngo 1.22\n", encoding="utf-8")
         args = make_init_args(detect=True)
         cli.apply_updates(str(tmp_path), args)